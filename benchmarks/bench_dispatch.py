@@ -0,0 +1,386 @@
+"""Dispatch overhead benchmarks.
+
+Run from the repository root:
+
+   > py benchmarks/bench_dispatch.py [--output results.json] [--filter name]
+
+Every case reports the best time per call in nanoseconds as JSON, so results
+of two commits can be compared with any JSON diff tool."""
+
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import time
+import timeit
+from functools import singledispatch
+from inspect import iscoroutinefunction
+from os.path import dirname, abspath
+from typing import List, Literal, Union
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from overloaded import Overloader
+
+
+cases = []
+
+def case(name, **params):
+    """Register a benchmark; the decorated function returns the callable to time."""
+    def register(setup):
+        cases.append((name, params, setup))
+        return setup
+    return register
+
+
+def make_classes(n):
+    return [type(f'C{i}', (), {}) for i in range(n)]
+
+
+def overload_per_class(overloaded, classes):
+    for i, cls in enumerate(classes):
+        def foo(a: cls, _i=i): return _i
+        overloaded(foo)
+
+
+for n in (1, 4, 16, 64):
+    for cache in (True, False):
+        @case('overloads', n=n, cache=cache)
+        def _(n=n, cache=cache):
+            overloaded = Overloader(cache_size=None if cache else 0)
+            classes = make_classes(n)
+            overload_per_class(overloaded, classes)
+            arg = classes[-1]()
+            foo = overloaded.foo
+            return lambda: foo(arg)
+
+    @case('singledispatch', n=n)
+    def _(n=n):
+        classes = make_classes(n)
+
+        @singledispatch
+        def foo(a): raise TypeError
+
+        for i, cls in enumerate(classes):
+            foo.register(cls, lambda a, _i=i: _i)
+
+        arg = classes[-1]()
+        return lambda: foo(arg)
+
+
+@case('direct')
+def _():
+    def foo(a): return a
+    return lambda: foo(1)
+
+
+@case('hint', kind='class')
+def _():
+    overloaded = Overloader()
+
+    @overloaded
+    def foo(a: str): return a
+
+    @overloaded
+    def foo(a: int): return a
+
+    return lambda: overloaded.foo(1)
+
+
+@case('hint', kind='union')
+def _():
+    overloaded = Overloader()
+
+    @overloaded
+    def foo(a: Union[str, bytes]): return a
+
+    @overloaded
+    def foo(a: Union[int, float]): return a
+
+    return lambda: overloaded.foo(1)
+
+
+for length in (1, 10, 100, 1000):
+    @case('hint', kind='List[int]', length=length)
+    def _(length=length):
+        overloaded = Overloader()
+
+        @overloaded
+        def foo(a: List[str]): return a
+
+        @overloaded
+        def foo(a: List[int]): return a
+
+        arg = list(range(length))
+        return lambda: overloaded.foo(arg)
+
+
+for policy in ('full', 'sample:10', 'shallow'):
+    for length in (10, 1000, 100000):
+        @case('container_check', policy=policy, length=length)
+        def _(policy=policy, length=length):
+            overloaded = Overloader(container_check=policy)
+
+            @overloaded
+            def foo(a: List[str]): return a
+
+            @overloaded
+            def foo(a: List[int]) -> List[int]: return a
+
+            arg = list(range(length))
+            return lambda: overloaded.foo(arg)
+
+
+for n in (1, 16, 256):
+    @case('literal', n=n)
+    def _(n=n):
+        overloaded = Overloader()
+        commands = [f'command{i}' for i in range(n)]
+        for i, command in enumerate(commands):
+            def run(name: Literal[command], _i=i): return _i
+            overloaded(run)
+
+        @overloaded
+        def run(name): return None
+
+        run = overloaded.run
+        return lambda: run(commands[-1])
+
+
+for kind in ('function', 'classmethod'):
+    for style in ('positional', 'mixed', 'keyword'):
+        for cache in (True, False):
+            @case('call', kind=kind, style=style, cache=cache)
+            def _(kind=kind, style=style, cache=cache):
+                overloaded = Overloader(cache_size=None if cache else 0)
+
+                @overloaded
+                def foo(a: int, b: str): return a
+
+                @overloaded
+                def foo(a: str, b: int): return a
+
+                @overloaded
+                class A:
+                    @overloaded.method
+                    @classmethod
+                    def bar(cls, a: int, b: str): return a
+
+                    @overloaded.method
+                    @classmethod
+                    def bar(cls, a: str, b: int): return a
+
+                if kind == 'function':
+                    foo = overloaded.foo
+                    calls = {
+                        'positional': lambda: foo(1, 'b'),
+                        'mixed': lambda: foo(1, b='b'),
+                        'keyword': lambda: foo(a=1, b='b'),
+                    }
+                else:
+                    bar = overloaded.A.bar
+                    calls = {
+                        'positional': lambda: bar(A, 1, 'b'),
+                        'mixed': lambda: bar(A, 1, b='b'),
+                        'keyword': lambda: bar(cls=A, a=1, b='b'),
+                    }
+                return calls[style]
+
+
+for kind in ('method', 'classmethod', 'staticmethod'):
+    @case('method', kind=kind)
+    def _(kind=kind):
+        overloaded = Overloader()
+
+        @overloaded
+        class A:
+            @overloaded.method
+            def meth(self, a: int): return a
+
+            @overloaded.method
+            @classmethod
+            def cmeth(cls, a: int): return a
+
+            @overloaded.method
+            @staticmethod
+            def smeth(a: int): return a
+
+        a = A()
+        if kind == 'method':
+            return lambda: overloaded.A.meth(a, 1)
+        elif kind == 'classmethod':
+            return lambda: overloaded.A.cmeth(A, 1)
+        return lambda: overloaded.A.smeth(1)
+
+
+for kind, chunksize in (('loop', None), ('map', None), ('map', 100), ('map', 1000)):
+    @case('batch', kind=kind, chunksize=chunksize, items=1000)
+    def _(kind=kind, chunksize=chunksize):
+        overloaded = Overloader(cache_size=0)
+        classes = make_classes(16)
+        overload_per_class(overloaded, classes)
+        items = [cls() for cls in classes[-4:]] * 250
+        foo = overloaded.foo
+        if kind == 'loop':
+            return lambda: [foo(item) for item in items]
+        return lambda: list(foo.map(items, chunksize=chunksize))
+
+
+for kind in ('attribute', 'class attribute', 'export'):
+    @case('lookup', kind=kind)
+    def _(kind=kind):
+        overloaded = Overloader()
+        overload_per_class(overloaded, make_classes(4))
+
+        @overloaded
+        class A:
+            @overloaded.method
+            def meth(self, a: int): return a
+
+        if kind == 'attribute':
+            return lambda: overloaded.foo
+        elif kind == 'class attribute':
+            return lambda: overloaded.A.meth
+        foo = overloaded.export('foo')
+        return lambda: foo
+
+
+for frozen in (False, True):
+    for call in ('function', 'method'):
+        @case('freeze', frozen=frozen, call=call)
+        def _(frozen=frozen, call=call):
+            overloaded = Overloader()
+            classes = make_classes(16)
+            overload_per_class(overloaded, classes)
+
+            @overloaded
+            class A:
+                @overloaded.method
+                def meth(self, a: int): return a
+
+                @overloaded.method
+                def meth(self, a: str): return a
+
+            if frozen:
+                overloaded.freeze()
+            arg, a = classes[-1](), A()
+            if call == 'function':
+                return lambda: overloaded.foo(arg)
+            return lambda: overloaded.A.meth(a, 1)
+
+
+for type_check in (False, True):
+    @case('with_id', type_check=type_check)
+    def _(type_check=type_check):
+        overloaded = Overloader()
+
+        @overloaded('adder')
+        def foo(a: int, b: int): return a + b
+
+        return lambda: overloaded.foo.with_id('adder', type_check=type_check)(1, 2)
+
+
+for kind in ('direct', 'sync', 'async'):
+    @case('asyncio', kind=kind)
+    def _(kind=kind):
+        overloaded = Overloader()
+
+        @overloaded
+        async def handle(request: bytes): return request
+
+        @overloaded
+        async def handle(request: str): return request
+
+        @overloaded
+        def handle_sync(request: bytes): return request
+
+        @overloaded
+        def handle_sync(request: str): return request
+
+        async def direct(request): return request
+
+        if kind == 'direct':
+            async def step(): return await direct('request')
+        elif kind == 'sync':
+            async def step(): return overloaded.handle_sync('request')
+        else:
+            async def step(): return await overloaded.handle('request')
+        return step
+
+
+for n in (1, 16, 64, 1024):
+    @case('registration', n=n)
+    def _(n=n):
+        classes = make_classes(n)
+        return lambda: overload_per_class(Overloader(), classes)
+
+
+def measure(f, repeat, min_time):
+    """Best time per call in nanoseconds; coroutine functions are awaited inside a running event loop."""
+    if iscoroutinefunction(f):
+        return asyncio.run(measure_async(f, repeat, min_time))
+
+    timer = timeit.Timer(f)
+    number, _ = timer.autorange()
+    number = max(number, int(number * min_time / 0.2))
+    return min(timer.repeat(repeat, number)) / number * 1e9
+
+
+async def measure_async(step, repeat, min_time):
+    async def run(number):
+        start = time.perf_counter()
+        for _ in range(number):
+            await step()
+        return time.perf_counter() - start
+
+    number = 1
+    while await run(number) < min_time:
+        number *= 2
+
+    return min([await run(number) for _ in range(repeat)]) / number * 1e9
+
+
+def metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+            cwd=dirname(abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'commit': commit,
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', help='write JSON here instead of stdout')
+    parser.add_argument('--filter', action='append', default=[], help='only run cases with this name (repeatable)')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.2, help='seconds per repetition')
+    args = parser.parse_args(argv)
+
+    results = []
+    for name, params, setup in cases:
+        if args.filter and name not in args.filter:
+            continue
+        ns = measure(setup(), args.repeat, args.min_time)
+        results.append({'name': name, 'params': params, 'ns_per_call': round(ns, 1)})
+        print(f'{name:<16}{json.dumps(params):<48}{ns:>14.1f} ns', file=sys.stderr)
+
+    report = json.dumps({'meta': metadata(), 'results': results}, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(report + '\n')
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Registry memory benchmarks.
+
+Run from the repository root:
+
+   > py benchmarks/bench_memory.py [--output results.json] [--sizes 10 1000 100000] [--single-name 1000]
+
+Reports the bytes allocated per registered overload, measured with tracemalloc,
+and the seconds registration takes without it, in the same JSON layout as bench_dispatch.py. Overloads are spread over names
+OVERLOADS_PER_NAME apiece, and separately all registered on a single name, as
+with serializers per message type, where per-name structures grow with n."""
+
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+from time import perf_counter
+from types import FunctionType
+from os.path import dirname, abspath
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from overloaded import Overloader
+from bench_dispatch import metadata
+
+
+OVERLOADS_PER_NAME = 10
+
+
+def template(a): return a
+
+
+def make_functions(n, classes, per_name):
+    """n functions spread over names, per_name apiece, each hinting one of the classes."""
+    functions = []
+    for i in range(n):
+        f = FunctionType(template.__code__, globals(), f'f{i // per_name}')
+        f.__annotations__ = {'a': classes[i % per_name]}
+        functions.append(f)
+    return functions
+
+
+def measure(n, per_name=OVERLOADS_PER_NAME):
+    """Bytes allocated by registering n overloads and still held afterwards, per overload."""
+    classes = [type(f'C{i}', (), {}) for i in range(per_name)]
+    functions = make_functions(n, classes, per_name)
+    gc.collect()
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    overloaded = Overloader()
+    for f in functions:
+        overloaded(f)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    assert len(overloaded.f0) == min(n, per_name)
+    return (after - before) / n
+
+
+def measure_time(n, per_name=OVERLOADS_PER_NAME):
+    """Seconds taken to register n overloads, untraced."""
+    classes = [type(f'C{i}', (), {}) for i in range(per_name)]
+    functions = make_functions(n, classes, per_name)
+    gc.collect()
+
+    start = perf_counter()
+    overloaded = Overloader()
+    for f in functions:
+        overloaded(f)
+    return perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', help='write JSON here instead of stdout')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 100000], help='numbers of overloads')
+    parser.add_argument('--single-name', type=int, nargs='*', default=[1000],
+                        help='numbers of overloads registered on a single name')
+    args = parser.parse_args(argv)
+
+    cases = [(n, OVERLOADS_PER_NAME) for n in args.sizes] + [(n, n) for n in args.single_name]
+    results = []
+    for n, per_name in cases:
+        params = {'overloads': n, 'per_name': per_name}
+        size, seconds = measure(n, per_name), measure_time(n, per_name)
+        results.append({'name': 'registry', 'params': params, 'bytes_per_overload': round(size),
+                        'seconds': seconds})
+        print(f'{"registry":<16}{json.dumps(params):<48}{size:>14.0f} B{seconds:>12.3f} s', file=sys.stderr)
+
+    report = json.dumps({'meta': metadata(), 'results': results}, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(report + '\n')
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
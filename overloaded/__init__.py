@@ -1,12 +1,42 @@
-from typing import get_type_hints, Union, Hashable, Type, Callable
-from types import SimpleNamespace, FunctionType
+from typing import get_type_hints, Union, Hashable, Type, Callable, Any, IO, Literal, get_origin, get_args
+from types import SimpleNamespace, FunctionType, MethodType
 from functools import partial
-from inspect import isclass
+from inspect import isclass, signature, Parameter, iscoroutinefunction
+from collections import OrderedDict, namedtuple
+from collections.abc import Iterable, Mapping, Sequence, Set
+from itertools import islice, compress
+from time import perf_counter_ns
+from threading import RLock, local
+from warnings import warn
+from weakref import WeakValueDictionary
+from enum import Enum
+from importlib import import_module
+from pickle import PicklingError, UnpicklingError
+from concurrent.futures import ProcessPoolExecutor
 
-from typeguard import typechecked
+from typeguard import typechecked, check_type
 
+try:
+    from typing import Annotated
+    with_extras = {'include_extras': True}
+except ImportError:  # Python 3.8: no hint has Annotated metadata, so Matchers never apply
+    Annotated = object()
+    with_extras = {}
+
+
+try:
+    from types import UnionType
+    union_types = (Union, UnionType)
+except ImportError:  # before Python 3.10 there are no X | Y hints
+    union_types = (Union,)
+
+
+__all__ = ['Overloader', 'AmbiguityWarning', 'Matcher']
+
+def is_union(hint) -> bool:
+    """Whether the hint is a Union, written Union[X, Y] or, from Python 3.10, X | Y."""
+    return get_origin(hint) in union_types
 
-__all__ = ['Overloader']
 
 def get_wrapper(f):
     if (wrapper := type(f)) is FunctionType:
@@ -15,6 +45,326 @@ def get_wrapper(f):
         return wrapper
 
 
+Matching = namedtuple('Matching', 'get_key matches')
+
+
+class Matcher:
+    """Fast checks for hints of the form Annotated[cls, *metadata], e.g. Annotated[ndarray, 'float64', 2].
+
+    Values of registered classes and their subclasses are told apart by get_key(value),
+    which must be hashable and decide matches(key, *metadata) on its own, so that it can
+    take part in the dispatch cache key. Annotated needs Python 3.9+."""
+
+    _registered = {}
+    _keys = {}
+
+    @classmethod
+    def register(cls,
+        target: Type,
+        get_key: Callable,
+        matches: Callable):
+
+        cls._registered[target] = Matching(get_key, matches)
+        cls._keys = {}
+        shared_checks.clear()
+
+    @classmethod
+    def unregister(cls, target: Type):
+        """Stop handling hints of target; overloads registered meanwhile keep the checks they were built with."""
+        del cls._registered[target]
+        cls._keys = {}
+        shared_checks.clear()
+
+    @classmethod
+    def lookup(cls, target: Type):
+        """Registration of the nearest class in target's MRO, or None."""
+        for base in target.__mro__:
+            if base in cls._registered:
+                return cls._registered[base]
+        return None
+
+    @classmethod
+    def of(cls, hint):
+        """Registration handling the hint, or None if it isn't an Annotated hint of a registered class."""
+        if get_origin(hint) is not Annotated:
+            return None
+        target = get_args(hint)[0]
+        return cls.lookup(target) if isclass(target) else None
+
+    @classmethod
+    def get_key(cls, target: Type):
+        """get_key of the class of values, or None; memoized per class."""
+        keys = cls._keys
+        try:
+            return keys[target]
+        except KeyError:
+            registered = cls.lookup(target)
+            get_key = keys[target] = None if registered is None else registered.get_key
+            return get_key
+
+
+def matched(hint) -> bool:
+    """Whether the hint, or every member of the Union, is decided by the value's type and Matcher key."""
+    return all(Matcher.of(member) is not None or depends_only_on_type(member) for member in union_members(hint))
+
+
+def depends_only_on_type(hint) -> bool:
+    """Whether the result of checking a value against the hint is decided by the value's type alone."""
+    if hint is Any:
+        return True
+    if is_union(hint):
+        return all(depends_only_on_type(arg) for arg in get_args(hint))
+    if not isclass(hint) or get_origin(hint) is not None:
+        return False
+    # protocols, named tuples and typed dicts are checked member by member
+    return not getattr(hint, '_is_protocol', False) and \
+        not hasattr(hint, '__required_keys__') and \
+        not (issubclass(hint, tuple) and hasattr(hint, '__annotations__'))
+
+
+# typeguard follows the numeric tower and treats bytes as bytes-like
+isinstance_targets = {
+    float: (float, int),
+    complex: (complex, float, int),
+    bytes: (bytes, bytearray, memoryview),
+}
+
+def isinstance_target(hint):
+    """Class or tuple of classes that isinstance can check the hint with, or None."""
+    if is_union(hint):
+        targets = tuple(isinstance_target(arg) for arg in get_args(hint))
+        if None in targets:
+            return None
+        return tuple(cls for target in targets for cls in (target if isinstance(target, tuple) else (target,)))
+    if hint is Any or not depends_only_on_type(hint) or issubclass(hint, IO):
+        return None
+    return isinstance_targets.get(hint, hint)
+
+
+def container_limit(policy: str):
+    """How many elements of a container argument to check: None for all of them.
+
+    'full' checks every element, 'shallow' only the container type, 'sample:k' the first k elements."""
+    if policy == 'full':
+        return None
+    if policy == 'shallow':
+        return 0
+    kind, _, k = policy.partition(':')
+    if kind == 'sample' and k.isdigit() and int(k) > 0:
+        return int(k)
+    raise ValueError(f"container check must be 'full', 'shallow' or 'sample:k', not {policy!r}")
+
+
+def container_origin(hint):
+    """The container class of a parameterized container hint like List[int], or None."""
+    origin = get_origin(hint)
+    if isclass(origin) and issubclass(origin, Iterable) and get_args(hint) and \
+        not issubclass(origin, (str, bytes)):
+        return origin
+    return None
+
+
+def restrict(hint, limit):
+    """With the shallow policy, parameterized containers are checked as their bare class."""
+    if limit != 0:
+        return hint
+    if is_union(hint):
+        return Union[tuple(restrict(member, limit) for member in get_args(hint))]
+    return container_origin(hint) or hint
+
+
+# containers whose elements can be looked at without being used up, unlike those of iterators
+reiterable = (Sequence, Set, Mapping)
+
+def sample_check(hint, limit) -> Callable:
+    """Predicate checking the container type and its first limit elements, or None if the hint isn't a container.
+
+    Only the type of other iterables is checked, sampling would consume the caller's elements."""
+    origin = container_origin(hint)
+    if origin is None:
+        return None
+
+    args = get_args(hint)
+    if issubclass(origin, tuple):
+        if len(args) != 2 or args[1] is not ...:
+            return None  # fixed-length tuples are checked in full
+        args = args[:1]
+
+    if issubclass(origin, Mapping) and len(args) == 2:
+        check_key, check_value = make_check(args[0], limit), make_check(args[1], limit)
+        return lambda value: isinstance(value, origin) and \
+            all(check_key(k) and check_value(v) for k, v in islice(value.items(), limit))
+    elif len(args) == 1:
+        check_element = make_check(args[0], limit)
+        return lambda value: isinstance(value, origin) and \
+            (not isinstance(value, reiterable) or all(map(check_element, islice(value, limit))))
+    return None
+
+
+# checkers of equal hints are shared among overloads while any of them uses one
+shared_checks = WeakValueDictionary()
+
+def make_check(hint, limit=None) -> Callable:
+    """Predicate telling whether a value satisfies the hint, without raising.
+
+    limit is the number of elements of a container to check, see container_limit."""
+    try:
+        return shared_checks[hint, limit]
+    except KeyError:
+        check = shared_checks[hint, limit] = build_check(hint, limit)
+        return check
+    except TypeError:  # unhashable hint
+        return build_check(hint, limit)
+
+
+def build_check(hint, limit) -> Callable:
+    if hint is Any:
+        return lambda value: True
+
+    registered = Matcher.of(hint)
+    if registered is not None:
+        target, *metadata = get_args(hint)
+        get_key, matches = registered.get_key, registered.matches
+        return lambda value: isinstance(value, target) and matches(get_key(value), *metadata)
+
+    if is_union(hint) and any(Matcher.of(member) is not None for member in get_args(hint)):
+        checks = [make_check(member, limit) for member in get_args(hint)]
+        return lambda value: any(check(value) for check in checks)
+
+    hint = restrict(hint, limit)
+
+    target = isinstance_target(hint)
+    if target is not None:
+        return lambda value: isinstance(value, target)
+
+    if limit is not None:
+        if is_union(hint):
+            checks = [make_check(member, limit) for member in get_args(hint)]
+            return lambda value: any(check(value) for check in checks)
+        check = sample_check(hint, limit)
+        if check is not None:
+            return check
+
+    def check(value):
+        try:
+            check_type('argument', value, hint)
+        except TypeError:
+            return False
+        return True
+
+    return check
+
+
+literal_types = (int, str, bytes, bool, type(None), Enum)
+
+def literal_values(hint) -> frozenset:
+    """Values a Literal hint (or a Union of them, possibly Optional) accepts, or None for other hints."""
+    if get_origin(hint) is Literal:
+        values = frozenset(arg for value in get_args(hint)
+            for arg in (literal_values(value) if get_origin(value) is Literal else (value,)))
+    elif is_union(hint):
+        values = [(None,) if arg is type(None) else literal_values(arg) for arg in get_args(hint)]
+        if None in values:
+            return None
+        values = frozenset().union(*values)
+    else:
+        return None
+    # typeguard rejects other values, so they must not get past the index
+    if not all(isinstance(value, literal_types) for value in values):
+        return None
+    return values
+
+
+def index_classes(hint):
+    """Classes whose presence in an argument's MRO decides the hint, or None if it can't be indexed.
+
+    Literal hints are indexed by the frozenset of their values instead.
+    For Matcher hints the presence is necessary only, the matcher is still to be checked."""
+    values = literal_values(hint)
+    if values is not None:
+        return values
+    if Matcher.of(hint) is not None:
+        hint = get_args(hint)[0]
+    target = isinstance_target(hint)
+    if target is None:
+        return None
+    classes = target if isinstance(target, tuple) else (target,)
+    # ABCs and other custom instance checks accept classes that are not in the MRO
+    if any(type(cls).__instancecheck__ is not type.__instancecheck__ for cls in classes):
+        return None
+    return classes
+
+
+def union_members(hint) -> tuple:
+    return get_args(hint) if is_union(hint) else (hint,)
+
+
+def at_least_as_specific(hint, other) -> bool:
+    """Whether every value satisfying hint satisfies other; _missing stands for no hint.
+
+    Errs on the side of False for hints it can't relate, which only leaves them unordered."""
+    if other is _missing or other is Any or other is object or hint == other:
+        return True
+    if hint is _missing or hint is Any:
+        return False
+    if is_union(hint) or is_union(other):
+        return all(any(at_least_as_specific(member, candidate) for candidate in union_members(other))
+            for member in union_members(hint))
+
+    if get_origin(hint) is Annotated or get_origin(other) is Annotated:
+        if get_origin(other) is not Annotated:
+            return at_least_as_specific(get_args(hint)[0], other)
+        return get_origin(hint) is Annotated and get_args(hint)[1:] == get_args(other)[1:] and \
+            at_least_as_specific(get_args(hint)[0], get_args(other)[0])
+
+    if get_origin(hint) is Literal:
+        if get_origin(other) is Literal:
+            return set(get_args(hint)) <= set(get_args(other))
+        target = isinstance_target(other)
+        return target is not None and all(isinstance(value, target) for value in get_args(hint))
+
+    target = isinstance_target(other)
+    if target is not None:
+        classes = isinstance_target(hint) or get_origin(hint)
+        if classes is None:
+            return False
+        return all(isclass(cls) and issubclass(cls, target) for cls in (classes if isinstance(classes, tuple) else (classes,)))
+
+    origin, other_origin = get_origin(hint), get_origin(other)
+    if origin is not None and origin == other_origin and len(get_args(hint)) == len(get_args(other)):
+        return all(at_least_as_specific(arg, other_arg) for arg, other_arg in zip(get_args(hint), get_args(other)))
+    return False
+
+
+class AmbiguityWarning(UserWarning):
+    """Two overloads accept some arguments in common and neither is more specific."""
+
+
+def signature_key(args, kwargs) -> tuple:
+    """Dispatch cache key: types of positional arguments, plus keyword names and their types if any.
+
+    Keywords are left in call order, which only costs a cache entry per order used."""
+    if kwargs:
+        return tuple(map(type, args)), tuple(kwargs), tuple(map(type, kwargs.values()))
+    return tuple(map(type, args))
+
+
+def value_key(value):
+    """Type of the value, paired with its Matcher key if its class is registered."""
+    get_key = Matcher.get_key(cls := type(value))
+    return cls if get_key is None else (cls, get_key(value))
+
+
+def matched_signature_key(args, kwargs) -> tuple:
+    """signature_key for overloads with Matcher hints."""
+    if kwargs:
+        return tuple(map(value_key, args)), tuple(kwargs), tuple(map(value_key, kwargs.values()))
+    return tuple(map(value_key, args))
+
+
+Wrapping = namedtuple('Wrapping', 'get_invoker get_inner')
+
+
 class WrappedIn:
 
     _registered = {}
@@ -22,13 +372,23 @@ class WrappedIn:
     @classmethod
     def register(cls, 
         wrapper: Type, 
-        get_callable,
-        get_inner):
+        get_callable=None,
+        get_inner=None,
+        *,
+        get_invoker=None):
+        """get_invoker(package, f) is called once per overload and returns a callable
+        taking the overload's arguments and calling f the way the wrapper would.
 
-        cls._registered[wrapper] = SimpleNamespace(
-            get_callable=get_callable,
-            get_inner=get_inner,
-        )
+        get_callable(package, args, kwargs), returning a callable of no arguments that calls package.f,
+        is the older form, still accepted in place of get_invoker though it costs a closure per call."""
+        if (get_callable is None) == (get_invoker is None):
+            raise TypeError('register() takes either get_invoker or get_callable')
+        if get_inner is None:
+            raise TypeError("register() missing required argument: 'get_inner'")
+        if get_invoker is None:
+            get_invoker = partial(callable_invoker, get_callable)
+
+        cls._registered[wrapper] = Wrapping(get_invoker, get_inner)
 
     @classmethod
     def this(cls, wrapper):
@@ -46,189 +406,1230 @@ class WrappedIn:
         return cls.unwrap(f).__name__
 
     @classmethod
-    def get_callable(cls, package, args, kwargs, original=False):
-        if original:
-            tchecked = package.f
-            package.f = package.original
+    def get_invoker(cls, package, f) -> Callable:
+        return cls[package.wrapper].get_invoker(package, f)
 
-        try:
-            f = cls[package.wrapper].get_callable(package, args, kwargs)
-        finally:
-            if original:
-                package.f = tchecked
 
-        return f
+def callable_invoker(get_callable, package, f):
+    """Invoker made of a get_callable of the older WrappedIn.register form."""
+    view = SimpleNamespace(f=f, original=package.original, id=package.id, cls=package.cls, wrapper=package.wrapper)
+    return lambda *args, **kwargs: get_callable(view, args, kwargs)()
 
 
-def classmethod_get_callable(package, args, kwargs):
-    kwargs = kwargs.copy()
+def classmethod_get_invoker(package, f):
     try:
-        cls_or_instance = kwargs.pop(package.original.__code__.co_varnames[0], None)
+        first = package.original.__code__.co_varnames[0]
     except IndexError:
         raise TypeError('function wrapped in classmethod must take at least 1 argument')
 
-    if not cls_or_instance:
-        try:
-            cls_or_instance = args[0]
-            args = args[1:]
-        except IndexError:
+    def invoke(*args, **kwargs):
+        if first in kwargs:
+            cls_or_instance = kwargs.pop(first)
+        elif not args:
             raise TypeError('classmethod takes at least 1 argument')
+        elif isclass(args[0]):
+            return f(*args, **kwargs)
+        else:
+            cls_or_instance, args = args[0], args[1:]
+        return f(cls_or_instance if isclass(cls_or_instance) else type(cls_or_instance), *args, **kwargs)
 
-    f = classmethod(package.f).__get__(cls_or_instance, package.cls)
-
-    return lambda: f(*args, **kwargs)
+    return invoke
 
 able_to_handle = \
     ((classmethod, 
-        classmethod_get_callable,
+        classmethod_get_invoker,
         lambda wrapped: wrapped.__func__),
     (staticmethod, 
-        lambda package, args, kwargs: lambda: staticmethod(package.f).__get__(None, package.cls)(*args, **kwargs),
+        lambda package, f: f,
         lambda wrapped: wrapped.__func__),
     (None, 
-        lambda package, args, kwargs: lambda: package.f(*args, **kwargs),
+        lambda package, f: f,
         lambda f: f))
 
-for case in able_to_handle:
-    WrappedIn.register(*case)
+for wrapper, get_invoker, get_inner in able_to_handle:
+    WrappedIn.register(wrapper, get_inner=get_inner, get_invoker=get_invoker)
+
+_missing = object()
+
+
+def renamed(f: FunctionType, qualname: str) -> FunctionType:
+    """Copy of the function whose frames profilers show as qualname."""
+    names = {'co_name': qualname}
+    if hasattr(f.__code__, 'co_qualname'):  # Python 3.11+
+        names['co_qualname'] = qualname
+    code = f.__code__.replace(**names)
+    copy = FunctionType(code, f.__globals__, qualname, f.__defaults__, f.__closure__)
+    copy.__kwdefaults__ = f.__kwdefaults__
+    copy.__qualname__ = qualname
+    return copy
+
+# parameter names repeat across overloads, one copy of each tuple and set of them is kept
+interned = {}
+
+def intern(value):
+    return interned.setdefault(value, value)
+
 
 class Packed:
 
-    sort_key = lambda o: o.hintcount
+    __slots__ = ('hintcount', 'priority', 'cacheable', 'matched', 'original', 'id', 'cls', 'wrapper', 'signature', 'invoke',
+        'return_hint', 'return_check', 'positional', 'positional_only', 'required', 'keyword', 'required_keyword',
+        'var_positional', 'var_keyword', 'class_parameter', 'checks', 'index_path', 'residual_checks', 'shape', 'shape_hints')
+
+    sort_key = lambda o: (o.priority, o.hintcount)
     sort_reverse = True
 
-    def __init__(self, f: Callable, hintcount: int, original: Callable, id: Hashable, cls: Type = None, wrapper: Type = None):
-        self.f = f
+    def __init__(self, hintcount: int, original: Callable, id: Hashable, cls: Type = None, wrapper: Type = None, hints: dict = None, priority: int = 0, container_check: str = 'full'):
         self.hintcount = hintcount
+        self.priority = priority
+        limit = container_limit(container_check)
+        checked_hints = {name: restrict(hint, limit) for name, hint in (hints or {}).items()}
+        self.cacheable = hints is not None and \
+            all(matched(hint) for name, hint in checked_hints.items() if name != 'return')
+        self.matched = any(Matcher.of(member) is not None
+            for name, hint in checked_hints.items() if name != 'return' for member in union_members(hint))
         self.original = original
         self.id = id
         self.cls = cls
         self.wrapper = wrapper
+        self.signature = signature(original)
+        self.invoke = WrappedIn.get_invoker(self, original)
+        # a coroutine function returns an awaitable for exactly the overload chosen by its arguments
+        self.return_hint = _missing if iscoroutinefunction(original) else (hints or {}).get('return', _missing)
+        self.return_check = None if self.return_hint is _missing else make_check(self.return_hint, limit)
+
+        params = self.signature.parameters.values()
+        positional = [p for p in params if p.kind in (Parameter.POSITIONAL_ONLY, Parameter.POSITIONAL_OR_KEYWORD)]
+        self.positional = intern(tuple(p.name for p in positional))
+        self.positional_only = intern(frozenset(p.name for p in positional if p.kind is Parameter.POSITIONAL_ONLY))
+        self.required = intern(tuple(p.default is Parameter.empty for p in positional))
+        self.keyword = intern(frozenset(p.name for p in params if p.kind is Parameter.KEYWORD_ONLY) | \
+            frozenset(self.positional) - self.positional_only)
+        self.required_keyword = intern(frozenset(p.name for p in params if p.kind is Parameter.KEYWORD_ONLY and p.default is Parameter.empty))
+        self.var_positional = any(p.kind is Parameter.VAR_POSITIONAL for p in params)
+        self.var_keyword = any(p.kind is Parameter.VAR_KEYWORD for p in params)
+
+        # classmethods are bound to their class, whatever is passed as the first argument
+        unchecked = self.positional[:1] if wrapper is classmethod else ()
+        # which the invoker also takes by keyword, ahead of the positional arguments
+        self.class_parameter = unchecked[0] if unchecked else None
+        # position is where positional arguments bind the parameter, see matches
+        self.checks = tuple(
+            (p.name, p.kind, make_check(hints[p.name], limit), self.positional.index(p.name) if p.name in self.positional else None)
+                for p in params if p.name in checked_hints and p.name not in unchecked)
+
+        path = [index_classes(checked_hints[name]) if name in checked_hints and name not in unchecked else None
+            for name in self.positional]
+        while path and path[-1] is None:
+            path.pop()
+        self.index_path = tuple(path)
+        indexed = {name for name, classes in zip(self.positional, path)
+            if classes is not None and Matcher.of(checked_hints[name]) is None}
+        self.residual_checks = tuple(check for check in self.checks if check[0] not in indexed)
+
+        # overloads are only compared for specificity against ones with the same kinds of parameters
+        var_positional = [p.name for p in params if p.kind is Parameter.VAR_POSITIONAL]
+        keyword_only = sorted(p.name for p in params if p.kind is Parameter.KEYWORD_ONLY)
+        var_keyword = [p.name for p in params if p.kind is Parameter.VAR_KEYWORD]
+        self.shape = intern((len(self.positional), self.var_positional, tuple(keyword_only), self.var_keyword))
+        self.shape_hints = tuple(
+            _missing if name in unchecked else (hints or {}).get(name, _missing)
+                for name in (*self.positional, *var_positional, *keyword_only, *var_keyword))
+
+    def explain_index(self, args) -> str:
+        """Why the type index ruled the overload out for the positional arguments."""
+        for (name, classes), value in zip(zip(self.positional, self.index_path), args):
+            if isinstance(classes, frozenset):
+                try:
+                    allowed = value in classes
+                except TypeError:  # unhashable
+                    allowed = False
+                if not allowed:
+                    return f'argument "{name}" is not one of ' + ', '.join(sorted(map(repr, classes)))
+            elif classes is not None and not any(cls in classes for cls in (*type(value).__mro__, *value.__class__.__mro__)):
+                return f'argument "{name}" is not an instance of ' + ' or '.join(cls.__qualname__ for cls in classes)
+        return None
+
+    def compare(self, other):
+        """None if the overloads accept disjoint or unrelated arguments, otherwise a pair telling
+        whether self is at least as specific as other and whether other is at least as specific as self."""
+        if self.shape != other.shape:
+            return None
+
+        le = ge = True
+        for hint, other_hint in zip(self.shape_hints, other.shape_hints):
+            hint_le = at_least_as_specific(hint, other_hint)
+            hint_ge = at_least_as_specific(other_hint, hint)
+            if not hint_le and not hint_ge:
+                return None
+            le, ge = le and hint_le, ge and hint_ge
+        return le, ge
+
+    def precedes(self, other) -> bool:
+        """Whether self must be tried before other: it has a higher priority, or the same one and is more specific."""
+        if self.priority != other.priority:
+            return self.priority > other.priority
+        return self.compare(other) == (True, False)
+
+    def accepts(self, npos: int, kwnames: frozenset) -> bool:
+        """Whether a call with npos positional arguments and the given keyword names binds to the signature."""
+        if self.class_parameter in kwnames:
+            npos, kwnames = npos + 1, kwnames - {self.class_parameter}
+        if npos > len(self.positional) and not self.var_positional:
+            return False
+
+        bound_positionally = self.positional[:npos]
+        for name in kwnames:
+            if name in bound_positionally and name not in self.positional_only:
+                return False
+            if name not in self.keyword and not self.var_keyword:
+                return False
+
+        for name, required in zip(self.positional[npos:], self.required[npos:]):
+            if required and (name not in kwnames or name in self.positional_only):
+                return False
+
+        return self.required_keyword <= kwnames
+
+    def matches(self, args, kwargs, indexed=False) -> bool:
+        """Check the arguments against the hints without calling the function.
+
+        The call must be one the signature accepts, see accepts; arguments are bound to parameters
+        directly, by position and by name, rather than through Signature.bind.
+        With indexed, the positional arguments were already matched against index_path."""
+        if self.class_parameter in kwargs:
+            args, kwargs = self.bind_first(args, kwargs)
+        npos = len(args)
+        for name, kind, check, position in (self.residual_checks if indexed else self.checks):
+            if position is not None:
+                if position < npos:
+                    value = args[position]
+                elif name in kwargs and name not in self.positional_only:
+                    value = kwargs[name]
+                else:
+                    continue  # left to its default
+            elif kind is Parameter.KEYWORD_ONLY:
+                if name not in kwargs:
+                    continue
+                value = kwargs[name]
+            elif kind is Parameter.VAR_POSITIONAL:
+                if not all(map(check, args[len(self.positional):])):
+                    return False
+                continue
+            else:
+                keyword = self.keyword
+                if not all(check(value) for name, value in kwargs.items() if name not in keyword):
+                    return False
+                continue
+            if not check(value):
+                return False
+
+        return True
+
+    def bind_first(self, args, kwargs):
+        """args and kwargs with the class of a classmethod passed by keyword moved first, as its invoker passes it."""
+        if self.class_parameter not in kwargs:
+            return args, kwargs
+        return (kwargs[self.class_parameter], *args), \
+            {name: value for name, value in kwargs.items() if name != self.class_parameter}
+
+    def explain(self, args, kwargs) -> str:
+        """Why the arguments don't match, or None if they do; matches, made readable for Aggregate.explain."""
+        args, kwargs = self.bind_first(args, kwargs)
+        try:
+            arguments = self.signature.bind(*args, **kwargs).arguments
+        except TypeError as e:
+            return str(e)
+
+        hints = None
+        for name, kind, check, _ in self.checks:
+            if name not in arguments:
+                continue
+            value = arguments[name]
+            values = value if kind is Parameter.VAR_POSITIONAL else \
+                value.values() if kind is Parameter.VAR_KEYWORD else (value,)
+            for value in values:
+                if not check(value):
+                    hints = hints or get_type_hints(self.original, **with_extras)
+                    try:
+                        check_type(f'argument "{name}"', value, hints[name])
+                    except TypeError as e:
+                        return str(e)
+                    return f'argument "{name}" does not match {hints[name]!r}'
+        return None
+
+    def call(self, args, kwargs):
+        """Call the original function once and check its return value."""
+        return self.check_return(self.invoke(*args, **kwargs))
+
+    def check_return(self, result):
+        if self.return_check is not None and not self.return_check(result):
+            # typeguard describes the mismatch
+            check_type('the return value', result, self.return_hint)
+        return result
+
+    @property
+    def f(self) -> Callable:
+        """The original function wrapped by typeguard, made on demand since few are ever needed."""
+        return typechecked(self.original, always=True)
+
+    @property
+    def label(self) -> str:
+        """Human readable name telling apart overloads of the same function."""
+        if self.id is not None:
+            return f'{self.original.__qualname__}[{self.id!r}]'
+        return f'{self.original.__qualname__}:{self.original.__code__.co_firstlineno}'
+
+
+class Stats:
+    """Dispatch counters of one Aggregate."""
+
+    __slots__ = ('calls', 'tried', 'max_tried', 'cache_hits', 'cache_misses', 'no_match', 'check_ns', 'call_ns', 'wins')
+
+    def __init__(self):
+        self.calls = self.tried = self.max_tried = 0
+        self.cache_hits = self.cache_misses = self.no_match = 0
+        self.check_ns = self.call_ns = 0
+        self.wins = {}
+
+    def as_dict(self) -> dict:
+        return {
+            'calls': self.calls,
+            'candidates_tried': self.tried,
+            'max_candidates_tried': self.max_tried,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'no_match': self.no_match,
+            'check_seconds': self.check_ns / 1e9,
+            'call_seconds': self.call_ns / 1e9,
+            'wins': {package.label: count for package, count in self.wins.items()},
+        }
+
+
+class TypeIndex:
+    """Discrimination tree over the classes of positional arguments.
+
+    Level n is keyed on the classes the n-th positional parameter accepts,
+    or on the values for Literal hints, so a value finds its overloads with one hash lookup
+    however many there are; parameters whose hints can't be indexed go down the wild branch.
+    by_value tells whether any level is keyed on values, so the candidates depend on more than types.
+    kwnames are the keywords of the calls indexed, a classmethod's class among them takes no level."""
+
+    __slots__ = ('packages', 'children', 'values', 'wild', 'leaves', 'by_value')
+
+    def __init__(self, packages=(), kwnames=frozenset()):
+        self.packages = packages
+        self.children = {}
+        self.values = {}
+        self.wild = None
+        self.leaves = []
+        self.by_value = False
+        for rank, package in enumerate(packages):
+            path = package.index_path[1:] if package.class_parameter in kwnames else package.index_path
+            self.insert(path, (rank, package))
+            self.by_value = self.by_value or any(isinstance(level, frozenset) for level in package.index_path)
+
+    def insert(self, path, item, depth=0):
+        if depth == len(path):
+            self.leaves.append(item)
+        elif path[depth] is None:
+            if self.wild is None:
+                self.wild = TypeIndex()
+            self.wild.insert(path, item, depth + 1)
+        else:
+            # Literal values compare by equality, as typeguard does
+            children = self.values if isinstance(path[depth], frozenset) else self.children
+            for key in path[depth]:
+                children.setdefault(key, TypeIndex()).insert(path, item, depth + 1)
+
+    def candidates(self, args) -> list:
+        """Packages that may accept the positional arguments, in rank order."""
+        found = {}
+        self.lookup(args, found, 0)
+        return [found[rank] for rank in sorted(found)]
+
+    def lookup(self, args, found, depth):
+        found.update(self.leaves)
+        if depth == len(args):
+            # the rest is passed by keyword or left to defaults
+            for child in self.children.values():
+                child.lookup(args, found, depth)
+            for child in self.values.values():
+                child.lookup(args, found, depth)
+        else:
+            arg = args[depth]
+            children = self.children
+            for cls in type(arg).__mro__:
+                if cls in children:
+                    children[cls].lookup(args, found, depth + 1)
+            # mocks and proxies pass isinstance as the class they claim to be
+            claimed = arg.__class__
+            if claimed is not type(arg) and isinstance(claimed, type):
+                for cls in claimed.__mro__:
+                    if cls in children:
+                        children[cls].lookup(args, found, depth + 1)
+            if self.values:
+                try:
+                    child = self.values.get(arg)
+                except TypeError:  # unhashable, so it equals none of the values
+                    child = None
+                if child is not None:
+                    child.lookup(args, found, depth + 1)
+        if self.wild is not None:
+            self.wild.lookup(args, found, min(depth + 1, len(args)))
+
+
+def plain_class(hint) -> bool:
+    """Whether the hint is a class that only it and its subclasses satisfy, so issubclass relates it to others."""
+    return isclass(hint) and get_origin(hint) is None and isinstance_target(hint) is hint and \
+        type(hint).__instancecheck__ is type.__instancecheck__
+
+
+class ShapeIndex:
+    """Overloads of one shape, indexed on their first hint, so that a new overload is only compared
+    against the ones it may be ordered with: for a plain class, its subclasses and bases;
+    for a Literal, the ones sharing a value or taking its values' classes. Other hints relate to anything."""
+
+    __slots__ = ('order', 'wild', 'classes', 'values', 'value_types')
+
+    def __init__(self):
+        self.order = {}
+        self.wild = []
+        self.classes = {}
+        self.values = {}
+        self.value_types = {}
+
+    @staticmethod
+    def first_hint(package):
+        return package.shape_hints[0] if package.shape_hints else _missing
+
+    def add(self, package):
+        self.order[package] = len(self.order)
+        hint = self.first_hint(package)
+        values = literal_values(hint)
+        if values is not None:
+            for value in values:
+                self.values.setdefault(value, []).append(package)
+                self.value_types.setdefault(type(value), []).append(package)
+        elif plain_class(hint):
+            self.classes.setdefault(hint, []).append(package)
+        else:
+            self.wild.append(package)
+
+    def related(self, package) -> list:
+        """Overloads the package may be more or less specific than, in definition order."""
+        hint = self.first_hint(package)
+        values = literal_values(hint)
+        if values is not None:
+            found = set(self.wild)
+            for value in values:
+                found.update(self.values.get(value, ()))
+                for cls in type(value).__mro__:
+                    found.update(self.classes.get(cls, ()))
+        elif plain_class(hint):
+            found = set(self.wild)
+            for cls in hint.__mro__:
+                found.update(self.classes.get(cls, ()))
+            if type.__subclasses__(hint):
+                for cls, packages in self.classes.items():
+                    if issubclass(cls, hint):
+                        found.update(packages)
+            for cls, packages in self.value_types.items():
+                if issubclass(cls, hint):
+                    found.update(packages)
+        else:
+            return list(self.order)
+        return sorted(found, key=self.order.__getitem__)
+
+
+# aggregates by module and qualified name of their functions, so that they pickle by reference
+_references = WeakValueDictionary()
+
+def by_reference(module: str, qualname: str):
+    """Unpickle an Aggregate; importing the module registers its overloads again."""
+    import_module(module)
+    try:
+        return _references[module, qualname]
+    except KeyError:
+        raise UnpicklingError(f'{module}.{qualname} is not overloaded') from None
 
 
 class Aggregate:    
 
-    def __init__(self, _type):
-        self._store = []
+    __slots__ = ('_store', '_key', '_pending', '_stats', '_type', '_cache', '_buckets', '_ids', '_proxies', '_shapes',
+        '_sort_keys', '_lock', '_reference', 'cache_size', '__weakref__')
+
+    default_cache_size = 256
+    # call shapes are few and fixed by the calling code, unlike argument types, so buckets get their own bound
+    bucket_limit = 64
+
+    def __init__(self, _type, cache_size: int = None, collect_stats: bool = False):
+        self._store = ()
+        self._key = signature_key
+        self._pending = []
+        self._stats = Stats() if collect_stats else None
         self._type = _type
+        self._cache = OrderedDict()
+        self._buckets = {}
+        self._ids = {}
+        self._proxies = {}
+        self._shapes = {}
+        self._sort_keys = []
+        self._lock = RLock()
+        self._reference = None
+        self.cache_size = self.default_cache_size if cache_size is None else cache_size
 
     def __call__(_self, /, *args, **kwargs):
+        if _self._pending:
+            _self.prepare()
+        if _self._stats is not None:
+            return _self._call_with_stats(args, kwargs)
 
-        _self._store.sort(reverse=_self._type.sort_reverse, key = _self._type.sort_key)  
-        
-        for package in _self._store:
-            f = WrappedIn.get_callable(package, args, kwargs)
+        # read before the key function, see add()
+        cache = _self._cache
+        key = _self._key(args, kwargs)
+        package = cache.get(key, _missing)
+
+        if package is not _missing:
             try:
-                return f()
-            except TypeError as error:
-                typechecked_error_messages_beginnings = [
-                    "too many positional arguments",
-                    "missing a required argument",
-                    "got an unexpected keyword argument",
-                    "type of argument",
-                ]
-
-                strerror = str(error)
-
-                if any(strerror.startswith(beginning) for beginning in typechecked_error_messages_beginnings) or \
-                    "positional argument" in strerror or \
-                    "required positional argument" in strerror:
-                    continue
-                else:
-                    raise error
+                cache.move_to_end(key)
+            except KeyError:  # evicted meanwhile by another thread
+                pass
         else:
-            if len(_self._store) > 1:
-                error_msg = "functions exist, but with the different signatures"
-            else:
-                error_msg = "function exists, but with a different signature"
+            package = _self._resolve(key, args, kwargs, cache)[0]
+
+        if package is None:
+            _self._raise_no_match()
+
+        result = package.invoke(*args, **kwargs)
+        if package.return_hint is not _missing:
+            package.check_return(result)
+        return result
+
+    def _call_with_stats(self, args, kwargs):
+        stats = self._stats
+        stats.calls += 1
+        start = perf_counter_ns()
+
+        cache = self._cache
+        key = self._key(args, kwargs)
+        package = cache.get(key, _missing)
+
+        if package is not _missing:
+            try:
+                cache.move_to_end(key)
+            except KeyError:
+                pass
+            stats.cache_hits += 1
+        else:
+            package, tried, _ = self._resolve(key, args, kwargs, cache)
+            stats.cache_misses += 1
+            stats.tried += tried
+            stats.max_tried = max(stats.max_tried, tried)
+
+        checked = perf_counter_ns()
+        stats.check_ns += checked - start
+
+        if package is None:
+            stats.no_match += 1
+            self._raise_no_match()
+
+        stats.wins[package] = stats.wins.get(package, 0) + 1
+        try:
+            result = package.invoke(*args, **kwargs)
+        finally:
+            called = perf_counter_ns()
+            stats.call_ns += called - checked
+
+        package.check_return(result)
+        stats.check_ns += perf_counter_ns() - called
+        return result
+
+    def _resolve(self, key, args, kwargs, cache):
+        """Find the first overload accepting the arguments; returns it (or None), how many were tried
+        and whether the outcome holds for any arguments with the same key.
+
+        The outcome goes to the cache read before resolving, which add() discards if it was stale."""
+        npos = len(args)
+        bucket = self._bucket(npos, frozenset(kwargs))
+        # overloads skipped for the values of arguments may accept others of the same types
+        cacheable = not bucket.by_value
+        tried = 0
+        for package in bucket.candidates(args):
+            cacheable = cacheable and package.cacheable
+            tried += 1
+            if package.matches(args, kwargs, npos >= len(package.index_path)):
+                break
+        else:
+            package = None
+
+        # the key holds types, proxies pass isinstance as whatever __class__ they claim
+        if cacheable and any(value.__class__ is not type(value) for value in (*args, *kwargs.values())):
+            cacheable = False
+
+        if cacheable:
+            self._remember(cache, key, package)
+
+        return package, tried, cacheable
+
+    def map(self, /, *iterables, chunksize: int = None):
+        """Lazily call the function on items of the iterables, like the builtin map."""
+        return self.starmap(zip(*iterables), chunksize=chunksize)
+
+    def starmap(self, iterable, chunksize: int = None):
+        """Lazily call the function with every tuple of arguments in iterable, like itertools.starmap.
+
+        Arguments are dispatched once per distinct key rather than once per item. With chunksize,
+        that many items are read ahead and called grouped by overload; results still come in order.
+        Items after one that no overload accepts are never called, but when a call raises,
+        items after it in its chunk may have been called already."""
+        if chunksize is not None and chunksize < 1:
+            raise ValueError('chunksize must be positive')
+        return self._starmap(iter(iterable), chunksize)
+
+    def process_map(self, /, *iterables, chunksize: int = 1, executor: ProcessPoolExecutor = None):
+        """Like map, with the calls spread over worker processes, of the executor or of a new pool.
+
+        The function is sent to the workers by reference, so it must be overloaded at module level."""
+        if executor is not None:
+            return executor.map(self, *iterables, chunksize=chunksize)
+        return self._process_map(iterables, chunksize)
+
+    def _process_map(self, iterables, chunksize):
+        with ProcessPoolExecutor() as executor:
+            yield from executor.map(self, *iterables, chunksize=chunksize)
+
+    def _starmap(self, items, chunksize):
+        if self._pending:
+            self.prepare()
+        if self._stats is not None:
+            # keep counting every call
+            for args in items:
+                yield self(*args)
+            return
+
+        cache = get_key = resolved = None
+
+        def dispatch(args):
+            nonlocal cache, get_key, resolved
+            if self._cache is not cache:  # overloads added meanwhile
+                # the cache is replaced last, see add()
+                cache, get_key, resolved = self._cache, self._key, {}
+            key = get_key(args, {})
+            package = resolved.get(key, _missing)
+            if package is _missing:
+                package, _, cacheable = self._resolve(key, args, {}, cache)
+                if cacheable:
+                    resolved[key] = package
+            return package
+
+        def call(package, args):
+            if package is None:
+                self._raise_no_match()
+            result = package.invoke(*args)
+            if package.return_hint is not _missing:
+                package.check_return(result)
+            return result
+
+        if chunksize is None:
+            for args in items:
+                yield call(dispatch(args), args)
+            return
+
+        while chunk := list(islice(items, chunksize)):
+            packages = list(map(dispatch, chunk))
+            # up to the first item no overload accepts, like one by one
+            end = packages.index(None) if None in packages else len(chunk)
+
+            groups = {}
+            for position in range(end):
+                groups.setdefault(packages[position], []).append(position)
 
-            raise TypeError(error_msg)
+            results = [None] * end
+            for package, positions in groups.items():
+                for position in positions:
+                    results[position] = call(package, chunk[position])
+
+            yield from results
+            if end < len(chunk):
+                self._raise_no_match()
+
+    def _bucket(self, npos, kwnames):
+        """Index of the overloads whose signatures can bind a call of this shape."""
+        shape = npos, kwnames
+        # read before the store, see add()
+        buckets = self._buckets
+        try:
+            return buckets[shape]
+        except KeyError:
+            bucket = TypeIndex(tuple(package for package in self._store if package.accepts(npos, kwnames)), kwnames)
+            if len(buckets) >= self.bucket_limit:
+                buckets.clear()
+            buckets[shape] = bucket
+            return bucket
+
+    def _remember(self, cache, key, package):
+        """Cache the dispatch outcome (None means no candidate matched), evicting the least recently used."""
+        if self.cache_size <= 0:
+            return
+        cache[key] = package
+        if len(cache) > self.cache_size:
+            try:
+                cache.popitem(last=False)
+            except KeyError:
+                pass
+
+    def _raise_no_match(self):
+        if len(self._store) > 1:
+            error_msg = "functions exist, but with the different signatures"
+        else:
+            error_msg = "function exists, but with a different signature"
+
+        raise TypeError(error_msg)
+
+    def stats(self) -> dict:
+        """Counters collected since the last reset, empty when stats are not collected."""
+        return {} if self._stats is None else self._stats.as_dict()
+
+    def reset_stats(self):
+        if self._stats is not None:
+            self._stats = Stats()
 
     def __str__(self):
         return f"{self.__class__.__name__}({self._store})"
 
+    def publish(self, module: str, qualname: str):
+        """Make the aggregate picklable as the overloaded function module.qualname."""
+        if self._reference is None:
+            self._reference = module, qualname
+            _references[module, qualname] = self
+
+    def __getattr__(self, name):
+        # named like the functions it dispatches to, for introspection, profilers and pickle
+        if name in ('__name__', '__qualname__') and self._reference is not None:
+            qualname = self._reference[1]
+            return qualname if name == '__qualname__' else qualname.rpartition('.')[2]
+        raise AttributeError(f'{self.__class__.__name__!r} object has no attribute {name!r}')
+
+    def name_frames(self):
+        """Make profilers show calls as overloaded.<qualname> frames of their own rather than Aggregate.__call__.
+
+        Costs a class per aggregate, since Python looks __call__ up on the type."""
+        cls = type(self)
+        if self._reference is None or getattr(cls, '_named', False):
+            return
+        qualname = f'overloaded.{self.__qualname__}'
+        # object's, since frozen aggregates refuse attribute assignment
+        object.__setattr__(self, '__class__', type(qualname, (cls,), {
+            '__slots__': (),
+            '_named': True,
+            '__call__': renamed(cls.__call__, qualname),
+        }))
+
+    def explain(_self, /, *args, **kwargs) -> dict:
+        """How a call with these arguments is dispatched, without calling anything or touching the cache.
+
+        Lists every overload in dispatch order with its outcome: chosen, rejected and why,
+        or not tried since an earlier one was chosen; and the time its checks took."""
+        if _self._pending:
+            _self.prepare()
+        key = _self._key(args, kwargs)
+        bucket = _self._bucket(len(args), frozenset(kwargs))
+        in_bucket = set(bucket.packages)
+        candidates = set(bucket.candidates(args))
+
+        chosen = None
+        overloads = []
+        for package in _self._store:
+            seconds = 0.0
+            if chosen is not None:
+                outcome, reason = 'not tried', None
+            elif package not in in_bucket:
+                outcome = 'rejected'
+                reason = f'does not take {len(args)} positional arguments' + \
+                    (f' and keywords {", ".join(sorted(kwargs))}' if kwargs else '')
+            elif package not in candidates:
+                outcome, reason = 'rejected', package.explain_index(package.bind_first(args, kwargs)[0])
+            else:
+                start = perf_counter_ns()
+                reason = package.explain(args, kwargs)
+                seconds = (perf_counter_ns() - start) / 1e9
+                outcome = 'rejected' if reason is not None else 'chosen'
+                if reason is None:
+                    chosen = package
+            overloads.append({'overload': package.label, 'outcome': outcome, 'reason': reason, 'seconds': seconds})
+
+        return {
+            'chosen': None if chosen is None else chosen.label,
+            'cached': key in _self._cache,
+            'overloads': overloads,
+        }
+
+    def __reduce__(self):
+        if self._reference is None or _references.get(self._reference) is not self:
+            raise PicklingError(f'{self} is not reachable by reference')
+        return by_reference, self._reference
+
     def __len__(self):
+        self.prepare()
         return self._store.__len__()
 
+    def defer(self, pack: Callable):
+        """Postpone registration until the first call; pack adds the overload when called."""
+        self._pending.append(pack)
+
+    def prepare(self):
+        """Register the overloads deferred so far."""
+        with self._lock:
+            pending = self._pending
+            while pending:
+                pending[0]()
+                del pending[0]
+
     def add(self, *args, **kwargs):
-        self._store.append(self._type(*args, **kwargs))
+        """Insert an overload after every one that must precede it and before every one it must precede.
+        Among the positions left, sort_key decides, and definition order after it.
+        Specificity only orders overloads of the same shape and priority, see ShapeIndex;
+        sort_key puts higher priorities first.
+
+        Readers never lock: the store is replaced by a new tuple, and the caches derived from it
+        by new empty ones afterwards, the dispatch cache last. A reader that picked up the old
+        dispatch cache can only fill a cache that is already discarded; one that picked up
+        the new one only ever sees the new store and buckets."""
+        package = self._type(*args, **kwargs)
+        sort_key, reverse = self._type.sort_key, self._type.sort_reverse
+        key = sort_key(package)
+
+        with self._lock:
+            store = self._store
+            shape = self._shapes.get(package.shape)
+            if shape is None:
+                shape = self._shapes[package.shape] = ShapeIndex()
+
+            preceding, following = set(), set()
+            for other in shape.related(package):
+                if other.priority != package.priority:
+                    continue
+                order = other.compare(package)
+                if order == (True, False):
+                    preceding.add(other)
+                elif order == (False, True):
+                    following.add(other)
+                elif order == (False, False):
+                    warn(f'{other.label} and {package.label} are ambiguous: neither is more specific than the other',
+                        AmbiguityWarning)
+
+            lowest, highest = 0, len(store)
+            if preceding or following:
+                for i, other in enumerate(store):
+                    if other in preceding:
+                        lowest = i + 1
+                    elif other in following:
+                        highest = min(highest, i)
+            # the first position whose overload sorts after this one, found without a call per overload
+            sorts_after = key.__gt__ if reverse else key.__lt__
+            keys = self._sort_keys
+            position = next(compress(range(lowest, highest), map(sorts_after, islice(keys, lowest, highest))), highest)
+
+            shape.add(package)
+            keys.insert(position, intern(key))
+            store = self._store = store[:position] + (package,) + store[position:]
+            if package.id is not None:
+                owner = self._ids.get(package.id)
+                # the first overload in dispatch order owns a repeated id
+                if owner is None or store.index(owner) > position:
+                    self._ids = {**self._ids, package.id: package}
+            self._proxies = {}
+            if package.matched:
+                self._key = matched_signature_key
+            self._buckets = {}
+            self._cache = OrderedDict()
+        return package
 
     def with_id(self, /, id, type_check=False) -> Callable:
         """On default returns the original function."""
-        class Proxy:
-            def __init__(self, /, package, original):
-                self.package = package
-                self.original = original
+        assert id is not None, 'ID must not be None'
 
-            def __call__(self, /, *args, **kwargs):
-                f = WrappedIn.get_callable(self.package, args, kwargs, self.original)
-                return f()
+        if self._pending:
+            self.prepare()
 
+        proxies = self._proxies
+        try:
+            return proxies[id, type_check]
+        except KeyError:
+            pass
 
-        assert id is not None, 'ID must not be None'
+        try:
+            package = self._ids[id]
+        except KeyError:
+            raise KeyError(f'function with id {id!r} does not exist') from None
 
-        for el in self._store:
-            if el.id == id:
-                f = Proxy(el, not type_check)
-                return f
-        else:
-            raise KeyError(f'function with id {id!r} does not exist')
+        proxy = proxies[id, type_check] = \
+            Proxy(package, WrappedIn.get_invoker(package, package.f if type_check else package.original), self, type_check)
+        return proxy
+
+
+class FrozenAggregate:
+    """Immutable Aggregate made by Overloader.freeze(): it takes no overloads,
+    so dispatch needs no pending check and no cache reordering."""
+
+    __slots__ = ('_store', '_key', '_pending', '_stats', '_cache', '_buckets', '_ids', '_proxies', '_reference', 'cache_size',
+        '__weakref__')
+
+    def __init__(self, aggregate: Aggregate):
+        aggregate.prepare()
+        with aggregate._lock:
+            for name in ('_store', '_key', '_stats', '_ids', '_reference', 'cache_size'):
+                object.__setattr__(self, name, getattr(aggregate, name))
+        object.__setattr__(self, '_pending', ())
+        object.__setattr__(self, '_cache', OrderedDict())
+        object.__setattr__(self, '_buckets', {})
+        object.__setattr__(self, '_proxies', {})
+        if self._reference is not None and _references.get(self._reference) is aggregate:
+            _references[self._reference] = self
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{self.__class__.__name__} is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'{self.__class__.__name__} is immutable')
+
+    def __call__(_self, /, *args, **kwargs):
+        if _self._stats is not None:
+            return _self._call_with_stats(args, kwargs)
+
+        cache = _self._cache
+        key = _self._key(args, kwargs)
+        package = cache.get(key, _missing)
+        if package is _missing:
+            package = _self._resolve(key, args, kwargs, cache)[0]
+
+        if package is None:
+            _self._raise_no_match()
+
+        result = package.invoke(*args, **kwargs)
+        if package.return_hint is not _missing:
+            package.check_return(result)
+        return result
+
+    def _remember(self, cache, key, package):
+        """Cache the dispatch outcome until the cache is full; nothing is ever evicted."""
+        if len(cache) < self.cache_size:
+            cache[key] = package
+
+    def __len__(self):
+        return len(self._store)
+
+    def prepare(self):
+        """Nothing is pending once frozen."""
+
+    def reset_stats(self):
+        if self._stats is not None:
+            self._stats.__init__()
+
+    _call_with_stats = Aggregate._call_with_stats
+    _resolve = Aggregate._resolve
+    _bucket = Aggregate._bucket
+    bucket_limit = Aggregate.bucket_limit
+    _raise_no_match = Aggregate._raise_no_match
+    stats = Aggregate.stats
+    explain = Aggregate.explain
+    name_frames = Aggregate.name_frames
+    __getattr__ = Aggregate.__getattr__
+    __str__ = Aggregate.__str__
+    __reduce__ = Aggregate.__reduce__
+    with_id = Aggregate.with_id
+    map = Aggregate.map
+    starmap = Aggregate.starmap
+    _starmap = Aggregate._starmap
+    process_map = Aggregate.process_map
+    _process_map = Aggregate._process_map
+
+
+class Proxy:
+    """Calls one particular overload, skipping dispatch; named after its label, e.g. foo['adder']."""
+
+    __slots__ = ('package', 'call', 'aggregate', 'type_check')
+
+    def __init__(self, /, package, call, aggregate, type_check):
+        self.package = package
+        self.call = call
+        self.aggregate = aggregate
+        self.type_check = type_check
+
+    def __call__(self, /, *args, **kwargs):
+        return self.call(*args, **kwargs)
+
+    def __reduce__(self):
+        return Aggregate.with_id, (self.aggregate, self.package.id, self.type_check)
+
+    def __getattr__(self, name):
+        if name in ('__name__', '__qualname__'):
+            return self.package.label
+        raise AttributeError(f'{self.__class__.__name__!r} object has no attribute {name!r}')
 
 
 class defaultnamespace:
+    """Entries are created on item access, which registration uses; reading an unknown attribute raises.
+    _on_change(name) is called whenever an entry is added, replaced or removed."""
 
-    def __init__(self, _get_inst):
-        self._get_inst = _get_inst
+    __slots__ = ('_get_inst', '_on_change', '__dict__')
+
+    def __init__(self, _get_inst, _on_change=None):
+        object.__setattr__(self, '_get_inst', _get_inst)
+        object.__setattr__(self, '_on_change', _on_change)
 
     def __getattr__(self, name):
-        setattr(self, name, self._get_inst())
-        return getattr(self, name)
+        raise AttributeError(f'{name} is not overloaded')
+
+    def __getitem__(self, name):
+        entries = vars(self)
+        try:
+            return entries[name]
+        except KeyError:
+            # setdefault keeps one instance when threads race to create it
+            entry = entries.setdefault(name, self._get_inst())
+            self._changed(name)
+            return entry
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        self._changed(name)
+
+    def __delattr__(self, name):
+        object.__delattr__(self, name)
+        self._changed(name)
+
+    def _changed(self, name):
+        if self._on_change is not None:
+            self._on_change(name)
+
+
+class OverloadedMethod:
+    """Descriptor installed on overloaded classes, so that methods dispatch when called the usual way."""
+
+    __slots__ = ('aggregate', 'wrapper', 'bound')
+
+    def __init__(self, aggregate, wrapper):
+        self.aggregate = aggregate
+        self.wrapper = wrapper
+        self.bound = {}
+
+    def __get__(self, instance, owner=None):
+        if self.wrapper is staticmethod:
+            return self.aggregate
+        elif self.wrapper is classmethod:
+            if owner is None:
+                owner = type(instance)
+            try:
+                return self.bound[owner]
+            except KeyError:
+                bound = self.bound[owner] = MethodType(self.aggregate, owner)
+                return bound
+        elif instance is None:
+            return self.aggregate
+        else:
+            return MethodType(self.aggregate, instance)
+
+
+class frozennamespace(SimpleNamespace):
+
+    def __setattr__(self, name, value):
+        raise AttributeError('overloads can not be added after freeze()')
+
+    def __delattr__(self, name):
+        raise AttributeError('overloads can not be added after freeze()')
 
     def __getitem__(self, name):
         return getattr(self, name)
 
 
+def namespace_items(namespace):
+    return vars(namespace).items()
+
+
+# attributes of an Overloader taking precedence over the functions and classes overloaded with it;
+# the rest of its attributes give way to them, and stay reachable through the class, e.g. Overloader.freeze(overloaded)
+own_attributes = frozenset({'store', 'clsstore', 'method', 'tempmethods'})
+
+
+def own(overloader, name):
+    """Attribute of the Overloader itself, even if a function or class overloaded with it has that name."""
+    return object.__getattribute__(overloader, name)
+
+
 class Overloader:
 
-    def __init__(self):
-        self.store = defaultnamespace(lambda: Aggregate(Packed))
-        self.clsstore = defaultnamespace(lambda: defaultnamespace(lambda: Aggregate(Packed)))
-        self.tempmethods = []
+    def __init__(self, cache_size: int = None, collect_stats: bool = False, lazy: bool = False, descriptors: bool = False,
+        container_check: str = 'full', named_frames: bool = False):
+        """With lazy, type hints are resolved and checkers built on the first call of each function.
+        With descriptors, overloaded classes get their methods replaced with dispatching descriptors.
+        container_check is the default of how much of container arguments to check, see container_limit.
+        With named_frames, profilers show dispatch and classmethod invokers as frames named after the overloads."""
+        container_limit(container_check)
+        new_aggregate = lambda: Aggregate(Packed, cache_size, collect_stats)
+        # functions and classes by name, functions winning, so that attribute access is a single lookup
+        names = self._names = {}
+
+        def sync(name):
+            entries = vars(store) if name in vars(store) else vars(clsstore)
+            if name in entries:
+                names[name] = entries[name]
+            else:
+                names.pop(name, None)
+
+        store = self.store = defaultnamespace(new_aggregate, sync)
+        clsstore = self.clsstore = defaultnamespace(lambda: defaultnamespace(new_aggregate), sync)
+        self._local = local()
+        self.lazy = lazy
+        self.descriptors = descriptors
+        self.container_check = container_check
+        self.named_frames = named_frames
+
+    @property
+    def tempmethods(self) -> list:
+        """Methods collected for the class being decorated, per thread since class bodies of
+        different threads may be executing at the same time."""
+        try:
+            return own(self, '_local').tempmethods
+        except AttributeError:
+            tempmethods = own(self, '_local').tempmethods = []
+            return tempmethods
+
+    def method(self, f_or_id = None, id = None, priority: int = 0, container_check: str = None):
+        if container_check is not None:
+            container_limit(container_check)
 
-    def method(self, f_or_id, id = None):
         if WrappedIn.this(get_wrapper(f_or_id)):
-            self.tempmethods.append((f_or_id, id))
+            self.tempmethods.append((f_or_id, id, priority, container_check))
             return f_or_id
         else:
-            return partial(self.method, id = f_or_id)
+            return partial(self.method, id = f_or_id, priority = priority, container_check = container_check)
+
+    def aggregates(self):
+        """Yields (class name or None, function name, Aggregate) for everything registered."""
+        for name, aggregate in namespace_items(self.store):
+            yield None, name, aggregate
+        for clsname, methods in namespace_items(self.clsstore):
+            for name, aggregate in namespace_items(methods):
+                yield clsname, name, aggregate
+
+    def stats(self) -> dict:
+        """Dispatch counters of every function and method, as a JSON-serializable dict."""
+        result = {'store': {}, 'clsstore': {}}
+        for clsname, name, aggregate in Overloader.aggregates(self):
+            if clsname is None:
+                result['store'][name] = aggregate.stats()
+            else:
+                result['clsstore'].setdefault(clsname, {})[name] = aggregate.stats()
+        return result
+
+    def reset_stats(self):
+        for _, _, aggregate in Overloader.aggregates(self):
+            aggregate.reset_stats()
+
+    def prepare(self):
+        """Resolve everything registered lazily, e.g. before serving traffic."""
+        for _, _, aggregate in Overloader.aggregates(self):
+            aggregate.prepare()
+
+    def export(self, name: str) -> Callable:
+        """Dispatcher of the function, or 'Class.method', overloaded as name, e.g. to bind to a local name in hot loops."""
+        clsname, _, name = name.rpartition('.')
+        namespace = vars(self.clsstore).get(clsname) if clsname else self.store
+        try:
+            if namespace is not None:
+                return vars(namespace)[name]
+        except KeyError:
+            pass
+        raise AttributeError(f'{".".join(filter(None, (clsname, name)))} is not overloaded')
+
+    def freeze(self):
+        """Stop accepting overloads and replace every Aggregate with a FrozenAggregate,
+        e.g. once the app is imported. Overloaded functions and classes become plain attributes."""
+        Overloader.prepare(self)
+        frozen = {}
+
+        def freeze_aggregate(aggregate):
+            frozen_aggregate = frozen[aggregate] = FrozenAggregate(aggregate)
+            if getattr(type(aggregate), '_named', False):
+                frozen_aggregate.name_frames()
+            return frozen_aggregate
+
+        store = frozennamespace(**{name: freeze_aggregate(aggregate) for name, aggregate in namespace_items(self.store)})
+        clsstore = frozennamespace(**{clsname: frozennamespace(**{name: freeze_aggregate(aggregate)
+            for name, aggregate in namespace_items(methods)}) for clsname, methods in namespace_items(self.clsstore)})
+
+        # installed descriptors dispatch with the frozen aggregates too
+        for aggregate, frozen_aggregate in frozen.items():
+            for package in aggregate._store:
+                if package.cls is not None:
+                    descriptor = vars(package.cls).get(package.original.__name__)
+                    if isinstance(descriptor, OverloadedMethod) and descriptor.aggregate is aggregate:
+                        descriptor.aggregate = frozen_aggregate
+                        descriptor.bound.clear()
 
-    def __call__(self, var: Union[Callable, Hashable]) -> Callable:
-        def get_type_hint_count(f):
-            return len(get_type_hints(f))
+        self.store, self.clsstore = store, clsstore
+        names = self._names = {**vars(clsstore), **vars(store)}
+        self.__class__ = FrozenOverloader
+        vars(self).update((name, value) for name, value in names.items() if name not in own_attributes)
 
-        def get_typechecked_f_and_hintcount(f):
-            hintcount = get_type_hint_count(f)
-            typechecked_f = typechecked(f, always=True)
-            return typechecked_f, hintcount
+    def __call__(self, var: Union[Callable, Hashable] = None, priority: int = 0, container_check: str = None) -> Callable:
+        if container_check is not None:
+            container_limit(container_check)
+
+        def get_hints(f):
+            hints = get_type_hints(f)
+            if not Matcher._registered:
+                return hints
+            # Annotated is stripped, except where a Matcher handles it
+            hints.update((name, hint) for name, hint in get_type_hints(f, **with_extras).items()
+                if Matcher.of(hint) is not None or is_union(hint) and any(map(Matcher.of, get_args(hint))))
+            return hints
+
+        def register(aggregate, f, id, cls=None, wrapper=None, priority=0, container_check=None):
+            if container_check is None:
+                container_check = own(self, 'container_check')
+            named_frames = own(self, 'named_frames')
+            aggregate.publish(f.__module__, f.__qualname__)
+            if named_frames:
+                aggregate.name_frames()
+
+            def pack():
+                hints = get_hints(f)
+                package = aggregate.add(len(hints), f, id, cls, wrapper, hints, priority, container_check)
+                if named_frames and package.invoke is not f:
+                    package.invoke = renamed(package.invoke, f'overloaded.{package.label}')
+
+            if own(self, 'lazy'):
+                aggregate.defer(pack)
+            else:
+                pack()
 
         def process_f(f, id=None):
-            typechecked_f, hintcount = get_typechecked_f_and_hintcount(f)
-            self.store[f.__name__].add(typechecked_f, hintcount, f, id)
+            register(self.store[f.__name__], f, id, priority=priority, container_check=container_check)
             return f
 
         def overload_class(cls):
-            def process_meth(cls, f, id):
+            def process_meth(cls, f, id, priority, container_check):
                 wrapper = get_wrapper(f)
                 unwrapped = WrappedIn.unwrap(f)
 
-                typechecked_f, hintcount = get_typechecked_f_and_hintcount(unwrapped)
-                self.clsstore[cls.__name__][unwrapped.__name__].add(typechecked_f, hintcount, unwrapped, id, cls, wrapper)
+                register(self.clsstore[cls.__name__][unwrapped.__name__], unwrapped, id, cls, wrapper, priority, container_check)
 
-            for method, id in self.tempmethods:
-                process_meth(cls, method, id)
+            wrappers = {}
+            for method, id, priority, container_check in self.tempmethods:
+                process_meth(cls, method, id, priority, container_check)
+                wrappers.setdefault(WrappedIn.get_name(method), set()).add(get_wrapper(method))
 
             self.tempmethods.clear()
 
+            if own(self, 'descriptors'):
+                for name, kinds in wrappers.items():
+                    if len(kinds) > 1:
+                        raise TypeError(f'overloads of {cls.__name__}.{name} mix different kinds of methods')
+                    setattr(cls, name, OverloadedMethod(self.clsstore[cls.__name__][name], kinds.pop()))
+
             return cls
 
         if isclass(var):
@@ -239,18 +1640,32 @@ class Overloader:
             return partial(process_f, id=var)
 
     def __getattribute__(self, name):
-        if name in {'store', 'clsstore', 'method', 'tempmethods'}:
+        if name in own_attributes:
             return object.__getattribute__(self, name)
-        else:
-            try:
-                return object.__getattribute__(object.__getattribute__(self, 'store'), name)
-            except AttributeError:
-                try:
-                    return object.__getattribute__(object.__getattribute__(self, 'clsstore'), name)
-                except AttributeError as e:
-                    if str(e).startswith("'defaultnamespace' object has no attribute"):
-                        raise AttributeError(f'Class "{name}" has no overloaded methods')
-                    else:
-                        raise
+        try:
+            return object.__getattribute__(self, '_names')[name]
+        except KeyError:
+            pass
+        try:
+            return object.__getattribute__(self, name)
+        except AttributeError:
+            raise AttributeError(f'Class "{name}" has no overloaded methods') from None
+
+
+class FrozenOverloader(Overloader):
+    """What an Overloader becomes after freeze(): functions and classes are looked up as plain attributes."""
+
+    __getattribute__ = object.__getattribute__
+
+    def __getattr__(self, name):
+        raise AttributeError(f'Class "{name}" has no overloaded methods')
+
+    def __call__(self, *args, **kwargs):
+        raise RuntimeError('overloads can not be added after freeze()')
+
+    method = __call__
+
+    def freeze(self):
+        """Already frozen."""
 
 # overloaded = Overloader()
@@ -12,5 +12,6 @@ setup(
     version = __version__,
     packages = find_packages(),
     long_description = open(join(dirname(__file__), 'README.rst')).read(),
-    install_requires=['typeguard']
+    install_requires=['typeguard'],
+    python_requires='>=3.8',
 )
\ No newline at end of file
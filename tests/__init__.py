@@ -1,7 +1,9 @@
 from overloaded import Overloader
 import pytest
 import sys
-from numbers import Number
+import warnings
+from fractions import Fraction
+from numbers import Number, Real
 
 @pytest.fixture
 def overloaded():
@@ -206,4 +206,959 @@ def test_collision(overloaded):
     def foo(self): ...
 
     overloaded.foo.with_id('some')(self=42)
-    overloaded.foo.with_id('some')(42)
\ No newline at end of file
+    overloaded.foo.with_id('some')(42)
+
+def test_dispatch_cache(overloaded):
+    calls = []
+
+    @overloaded
+    def foo(a: str): calls.append('str'); return 'str'
+
+    @overloaded
+    def foo(a: int): calls.append('int'); return 'int'
+
+    assert overloaded.foo(1) == 'int'
+    assert overloaded.foo(2) == 'int'
+    assert overloaded.foo(a=3) == 'int'
+    assert calls == ['int'] * 3
+    assert len(overloaded.foo._cache) == 2
+
+    with pytest.raises(TypeError):
+        overloaded.foo(1.5)
+
+    assert overloaded.foo._cache[(float,)] is None
+
+    @overloaded
+    def foo(a: float): return 'float'
+
+    assert not overloaded.foo._cache
+    assert overloaded.foo(1.5) == 'float'
+
+def test_dispatch_cache_is_bounded():
+    overloaded = Overloader(cache_size=2)
+
+    @overloaded
+    def foo(a): return a
+
+    for value in (1, 'a', 1.5, b''):
+        assert overloaded.foo(value) == value
+
+    assert list(overloaded.foo._cache) == [(float,), (bytes,)]
+
+def test_dispatch_cache_skips_value_dependent_hints(overloaded):
+    from typing import List
+
+    @overloaded
+    def foo(a: List[int]): return 'ints'
+
+    @overloaded
+    def foo(a: list): return 'list'
+
+    assert overloaded.foo([1, 2]) == 'ints'
+    assert overloaded.foo(['a']) == 'list'
+    assert overloaded.foo([1, 2]) == 'ints'
+    assert not overloaded.foo._cache
+
+def test_arity_buckets(overloaded):
+    @overloaded('none')
+    def foo(): ...
+
+    @overloaded('pair')
+    def foo(a, b=0): ...
+
+    @overloaded('pos-only')
+    def foo(a, /, *, c): ...
+
+    @overloaded('var')
+    def foo(*args, **kwargs): ...
+
+    def ids(npos, *kwnames):
+        return [package.id for package in overloaded.foo._bucket(npos, frozenset(kwnames)).packages]
+
+    assert ids(0) == ['none', 'var']
+    assert ids(1) == ['pair', 'var']
+    assert ids(0, 'a') == ['pair', 'var']
+    assert ids(1, 'c') == ['pos-only', 'var']
+    assert ids(0, 'a', 'c') == ['var']
+    assert ids(1, 'a') == ['var']
+    assert ids(3) == ['var']
+
+def test_only_the_chosen_overload_runs(overloaded):
+    calls = []
+
+    @overloaded
+    def foo(a: int, b: int):
+        calls.append('int')
+        raise TypeError('type of argument raised by the function itself')
+
+    @overloaded
+    def foo(a, b): calls.append('generic')
+
+    with pytest.raises(TypeError, match='raised by the function itself'):
+        overloaded.foo(1, 2)
+
+    overloaded.foo('1', 2)
+
+    assert calls == ['int', 'generic']
+
+def test_dispatch_calls_the_original(overloaded):
+    @overloaded
+    def foo(a: int): return sys._getframe(1).f_code.co_name
+
+    @overloaded
+    class A:
+        @overloaded.method
+        @staticmethod
+        def meth(a: int): return sys._getframe(1).f_code.co_name
+
+    # not called through the typeguard wrapper
+    assert overloaded.foo(1) != 'wrapper'
+    assert overloaded.A.meth(1) != 'wrapper'
+
+def test_return_value_is_checked(overloaded):
+    @overloaded
+    def foo(a: int) -> str: return a
+
+    with pytest.raises(TypeError, match='the return value'):
+        overloaded.foo(1)
+
+def test_type_index(overloaded):
+    from typing import List, Union
+
+    class Node: ...
+    class Leaf(Node): ...
+
+    classes = [type(f'Node{i}', (Node,), {}) for i in range(40)]
+    for i, cls in enumerate(classes):
+        def visit(node: cls, depth: int, _i=i): return _i
+        overloaded(visit)
+
+    @overloaded
+    def visit(node: Node, depth: Union[int, str]): return 'node'
+
+    @overloaded
+    def visit(node: Number, depth: List[int]): return 'number'
+
+    def ids(*args):
+        return [package.original(*args) for package in overloaded.visit._bucket(len(args), frozenset()).candidates(args)]
+
+    # Number is an ABC, so it can't be indexed and stays a candidate
+    assert ids(classes[7](), 0) == [7, 'node', 'number']
+    assert ids(Leaf(), 'deep') == ['node', 'number']
+    assert ids(1.5, [1]) == ['number']
+    assert ids(classes[3]()) == []
+
+    assert overloaded.visit(classes[7](), 0) == 7
+    assert overloaded.visit(classes[7](), depth=0) == 7
+    assert overloaded.visit(Leaf(), 0) == 'node'
+    assert overloaded.visit(1, [2]) == 'number'
+    with pytest.raises(TypeError):
+        overloaded.visit(1, ['2'])
+
+def test_type_index_follows_claimed_class(overloaded):
+    from unittest.mock import Mock
+
+    class Foo: ...
+
+    @overloaded
+    def foo(a: Foo): return 'foo'
+
+    @overloaded
+    def foo(a: int): return 'int'
+
+    assert overloaded.foo(Mock(spec=Foo)) == 'foo'
+    report = overloaded.foo.explain(Mock(spec=int))
+    assert [overload['outcome'] for overload in report['overloads']] == ['rejected', 'chosen']
+
+def test_proxies_are_not_cached_by_type(overloaded):
+    class Foo: ...
+    class Bar: ...
+
+    class Proxy:
+        def __init__(self, target): self.target = target
+
+        @property
+        def __class__(self): return type(self.target)
+
+    @overloaded
+    def foo(a: Foo): return 'foo'
+
+    @overloaded
+    def foo(a: Bar): return 'bar'
+
+    assert overloaded.foo(Proxy(Foo())) == 'foo'
+    assert overloaded.foo(Proxy(Bar())) == 'bar'
+    assert not overloaded.foo._cache
+
+def test_priority(overloaded):
+    @overloaded
+    def foo(a: Number, b: Number): return 'number'
+
+    @overloaded('real', priority=1)
+    def foo(a: Real, b: Real): return 'real'
+
+    @overloaded(priority=-1)
+    def foo(a: int, b: int): return 'int'
+
+    store = overloaded.foo._store
+
+    assert overloaded.foo(1, 2) == 'real'
+    assert overloaded.foo(1j, 2) == 'number'
+    assert overloaded.foo.with_id('real')(1, 2) == 'real'
+    assert overloaded.foo._store is store
+    assert [package.priority for package in store] == [1, 0, -1]
+
+def test_with_id_proxies_are_cached(overloaded):
+    @overloaded('adder')
+    def foo(a: int, b: int): return a + b
+
+    adder = overloaded.foo.with_id('adder')
+
+    assert overloaded.foo.with_id('adder') is adder
+    assert overloaded.foo.with_id('adder', type_check=True) is not adder
+    assert not hasattr(adder, '__dict__')
+    assert adder('a', 'b') == 'ab'
+
+    with pytest.raises(TypeError):
+        overloaded.foo.with_id('adder', type_check=True)('a', 'b')
+
+def test_dispatch_calls_the_invoker(overloaded):
+    @overloaded
+    def foo(a: int) -> int: return overloaded.foo._store[0].original is foo
+
+    assert overloaded.foo(1)
+    assert foo.__code__ is overloaded.foo._store[0].invoke.__code__
+
+def test_stats():
+    import json
+
+    overloaded = Overloader(collect_stats=True)
+
+    @overloaded('str')
+    def foo(a: str): return a
+
+    @overloaded
+    def foo(a: int): return a
+    foo_line = foo.__code__.co_firstlineno
+
+    @overloaded
+    class A:
+        @overloaded.method
+        def bar(self): ...
+
+    overloaded.foo(1)
+    overloaded.foo(2)
+    overloaded.foo('a')
+    with pytest.raises(TypeError):
+        overloaded.foo(1.5)
+    overloaded.A.bar(A())
+
+    stats = json.loads(json.dumps(overloaded.stats()))
+    foo = stats['store']['foo']
+
+    assert foo['calls'] == 4
+    assert foo['cache_hits'] == 1
+    assert foo['cache_misses'] == 3
+    assert foo['no_match'] == 1
+    assert foo['candidates_tried'] == 2
+    assert foo['max_candidates_tried'] == 1
+    assert foo["wins"] == {"test_stats.<locals>.foo['str']": 1, f'test_stats.<locals>.foo:{foo_line}': 2}
+    assert stats['clsstore']['A']['bar']['calls'] == 1
+
+    overloaded.reset_stats()
+    assert overloaded.stats()['store']['foo']['calls'] == 0
+
+def test_no_stats_by_default(overloaded):
+    @overloaded
+    def foo(): ...
+
+    overloaded.foo()
+    assert overloaded.stats() == {'store': {'foo': {}}, 'clsstore': {}}
+
+def test_lazy():
+    overloaded = Overloader(lazy=True)
+
+    @overloaded
+    def foo(a: 'Later'): return 'later'
+
+    @overloaded('int')
+    def foo(a: int): return 'int'
+
+    assert overloaded.foo._pending
+
+    class Later: ...
+    foo.__globals__['Later'] = Later
+    try:
+        assert overloaded.foo(Later()) == 'later'
+        assert not overloaded.foo._pending
+    finally:
+        del foo.__globals__['Later']
+
+    assert overloaded.foo.with_id('int')(1) == 'int'
+
+def test_lazy_prepare():
+    overloaded = Overloader(lazy=True)
+
+    @overloaded
+    def foo(a: 'Missing'): ...
+
+    @overloaded
+    class A:
+        @overloaded.method
+        def bar(self): ...
+
+    with pytest.raises(NameError):
+        overloaded.prepare()
+
+    assert len(overloaded.foo._pending) == 1
+
+    @overloaded
+    def baz(): ...
+
+    del overloaded.store.foo
+    overloaded.prepare()
+
+    assert len(overloaded.A.bar) == len(overloaded.baz) == 1
+
+def test_coroutine_functions(overloaded, recwarn):
+    import asyncio
+
+    @overloaded
+    async def foo(a: int) -> int: return a + 1
+
+    @overloaded
+    async def foo(a: str) -> str: return a + '!'
+
+    @overloaded
+    def foo(a: float) -> float: return a
+
+    async def main():
+        return await overloaded.foo(1), await overloaded.foo('a'), overloaded.foo(1.5)
+
+    assert asyncio.run(main()) == (2, 'a!', 1.5)
+    assert not [w for w in recwarn if issubclass(w.category, RuntimeWarning)]
+
+def test_specificity_over_definition_order(overloaded):
+    from typing import List, Optional
+
+    @overloaded
+    def foo(a: Number, b: Number): return 'number'
+
+    @overloaded
+    def foo(a: Real, b: Real): return 'real'
+
+    @overloaded
+    def foo(a: float, b: float): return 'float'
+
+    @overloaded
+    def foo(a: int, b: int): return 'int'
+
+    assert overloaded.foo(1, 2) == 'int'
+    assert overloaded.foo(1.5, 2) == 'float'
+    assert overloaded.foo(Fraction(1, 2), 2) == 'real'
+    assert overloaded.foo(1j, 2) == 'number'
+
+    @overloaded
+    def bar(a: Optional[list]): return 'optional'
+
+    @overloaded
+    def bar(a: List[int]): return 'ints'
+
+    @overloaded
+    def bar(a: list): return 'list'
+
+    assert overloaded.bar([1]) == 'ints'
+    assert overloaded.bar(['1']) == 'list'
+    assert overloaded.bar(None) == 'optional'
+
+    if sys.version_info >= (3, 10):
+        @overloaded
+        def baz(a: int | str): return 'union'
+
+        @overloaded
+        def baz(a: int): return 'int'
+
+        assert overloaded.baz(1) == 'int' and overloaded.baz('a') == 'union'
+        # X | Y hints are cached by type and indexed like Union[X, Y]
+        _, union = overloaded.baz._store
+        assert union.cacheable and set(union.index_path[0]) == {int, str}
+
+@pytest.mark.skipif(sys.version_info < (3, 10), reason='X | Y hints need Python 3.10+')
+def test_specificity_is_decided_per_overloader():
+    from typing import Union
+
+    first = Overloader()
+
+    @first
+    def foo(a: int | str): return 'union'
+
+    @first
+    def foo(a: int): return 'int'
+
+    # int | str == Union[int, str], nothing learned from the first may leak into the second
+    second = Overloader()
+
+    @second
+    def bar(a: Union[int, str]): return 'union'
+
+    @second
+    def bar(a: int): return 'int'
+
+    assert second.bar(1) == 'int' and second.bar('a') == 'union'
+
+def test_registration_compares_related_overloads_only(overloaded, monkeypatch):
+    from typing import Literal
+    from overloaded import Packed
+
+    compared = []
+    compare = Packed.compare
+    monkeypatch.setattr(Packed, 'compare', lambda self, other: compared.append(other) or compare(self, other))
+
+    class Node: ...
+    classes = [type(f'Node{i}', (Node,), {}) for i in range(50)]
+
+    def overload(cls):
+        def foo(a: cls): return cls
+        overloaded(foo)
+
+    for cls in classes:
+        overload(cls)
+    assert compared == []
+
+    @overloaded
+    def foo(a: Node): return 'node'
+
+    @overloaded
+    def foo(a: Literal['a', 'b']): return 'literal'
+    assert len(compared) == 50
+
+    @overloaded
+    def foo(a: str): return 'str'
+    assert len(compared) == 51
+
+    assert overloaded.foo(classes[7]()) is classes[7]
+    assert overloaded.foo(Node()) == 'node'
+    assert overloaded.foo('a') == 'literal' and overloaded.foo('c') == 'str'
+
+    # the first overload in dispatch order owns a repeated id
+    @overloaded('same')
+    def bar(a: Number): return 'number'
+
+    @overloaded('same')
+    def bar(a: int): return 'int'
+
+    @overloaded('same')
+    def bar(a: Real): return 'real'
+
+    assert overloaded.bar.with_id('same')(1.5) == 'int'
+
+def test_ambiguity_warning(overloaded):
+    from overloaded import AmbiguityWarning
+
+    @overloaded
+    def foo(a: int, b): return 'first'
+
+    with pytest.warns(AmbiguityWarning):
+        @overloaded
+        def foo(a, b: int): return 'second'
+
+    assert overloaded.foo(1, 1) == 'first'
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+
+        @overloaded
+        def bar(a: int, b): return 'first'
+
+        @overloaded('same')
+        def bar(a: int, b): return 'same'
+
+        @overloaded
+        def bar(a: str, b: str): return 'str'
+
+        @overloaded(priority=1)
+        def bar(a, b: int): return 'prioritized'
+
+    assert overloaded.bar(1, 1) == 'prioritized'
+    assert overloaded.bar(1, '1') == 'first'
+
+def test_container_check():
+    from typing import Dict, List, Optional, Tuple
+
+    overloaded = Overloader(container_check='shallow')
+
+    @overloaded
+    def foo(a: List[int]) -> List[int]: return a
+
+    @overloaded(container_check='sample:2')
+    def bar(a: Dict[str, int]): return 'dict'
+
+    @overloaded(container_check='sample:2')
+    def bar(a: Tuple[int, ...]): return 'tuple'
+
+    @overloaded(container_check='full')
+    def baz(a: Optional[List[int]]): return 'full'
+
+    @overloaded
+    def baz(a: Optional[List[int]]): return 'shallow'
+
+    assert overloaded.foo(['not', 'checked']) == ['not', 'checked']
+    assert overloaded.foo._store[0].cacheable
+    with pytest.raises(TypeError):
+        overloaded.foo(('a',))
+
+    assert overloaded.bar({'a': 1, 'b': 2, 'c': 'unchecked'}) == 'dict'
+    assert overloaded.bar((1, 2, 'unchecked')) == 'tuple'
+    with pytest.raises(TypeError):
+        overloaded.bar({'a': 1, 'b': '2'})
+    with pytest.raises(TypeError):
+        overloaded.bar((1, '2'))
+
+    assert overloaded.baz(None) == 'full'
+    assert overloaded.baz([1]) == 'full'
+    assert overloaded.baz(['1']) == 'shallow'
+
+    # nested containers are sampled too
+    @overloaded(container_check='sample:2')
+    def qux(a: List[List[int]]): return 'ints'
+
+    @overloaded
+    def qux(a: list): return 'list'
+
+    assert overloaded.qux([[1, 2, 'unchecked'], [3], ['unchecked']]) == 'ints'
+    assert overloaded.qux([[1, '2']]) == 'list'
+
+def test_sampling_leaves_iterators_alone():
+    from typing import Iterable, Iterator, List
+
+    overloaded = Overloader(container_check='sample:2')
+
+    @overloaded
+    def total(a: Iterator[int]): return sum(a)
+
+    @overloaded
+    def total(a: Iterable[str]): return 'str'
+
+    @overloaded
+    def first(a: List[str]): return 'str'
+
+    @overloaded
+    def first(a: List[int]): return a[0]
+
+    assert overloaded.total(iter([1, 2, 3, 4])) == 10
+    assert overloaded.total(x for x in (5, 6, 7)) == 18
+    assert overloaded.total(['1', '2']) == 'str'
+    assert overloaded.first([1, 2, '3']) == 1
+
+def test_container_check_policy_is_validated(overloaded):
+    with pytest.raises(ValueError):
+        Overloader(container_check='deep')
+
+    with pytest.raises(ValueError):
+        overloaded(container_check='sample:0')
+
+    with pytest.raises(ValueError):
+        overloaded.method(container_check='sample')
+
+@pytest.mark.skipif(sys.version_info < (3, 9), reason='Annotated needs Python 3.9')
+def test_matcher(overloaded, request):
+    from typing import Annotated, Optional
+    from overloaded import Matcher
+
+    class Array:
+        def __init__(self, dtype, ndim):
+            self.dtype, self.ndim = dtype, ndim
+            self.checked = 0
+
+    def get_key(array):
+        array.checked += 1
+        return array.dtype, array.ndim
+
+    Matcher.register(Array, get_key, lambda key, dtype, ndim=None: key[0] == dtype and ndim in (None, key[1]))
+    # other tests must not take the Matcher paths
+    request.addfinalizer(lambda: Matcher.unregister(Array))
+
+    @overloaded
+    def foo(a: Array): return 'any'
+
+    @overloaded
+    def foo(a: Annotated[Array, 'float64', 2]): return 'float64 matrix'
+
+    # different metadata leave overloads unordered, definition order decides
+    @overloaded
+    def foo(a: Annotated[Array, 'float64']): return 'float64'
+
+    @overloaded
+    def foo(a: Annotated[Array, 'int8', 1]): return 'int8 vector'
+
+    @overloaded
+    def foo(a: Annotated[int, 'unregistered']): return 'int'
+
+    @overloaded
+    def bar(a: Optional[Annotated[Array, 'int8']]): return 'int8 or None'
+
+    # annotated ones are tried before the bare class, whatever the order of definition
+    assert overloaded.foo._store[-2].original.__annotations__['a'] is Array
+
+    matrix = Array('float64', 2)
+    assert overloaded.foo(matrix) == 'float64 matrix'
+    assert overloaded.foo(Array('float64', 3)) == 'float64'
+    assert overloaded.foo(Array('int8', 1)) == 'int8 vector'
+    assert overloaded.foo(Array('int8', 2)) == 'any'
+    assert overloaded.foo(1) == 'int'
+    assert overloaded.bar(None) == overloaded.bar(Array('int8', 3)) == 'int8 or None'
+    with pytest.raises(TypeError):
+        overloaded.bar(Array('float64', 1))
+
+    # the key takes part in the cache key, the matchers run only on a cache miss
+    assert all(package.cacheable for package in overloaded.foo._store)
+    checked = matrix.checked
+    assert overloaded.foo(matrix) == 'float64 matrix'
+    assert matrix.checked == checked + 1
+    assert overloaded.foo(a=Array('float64', 3)) == 'float64'
+
+def test_map(overloaded):
+    @overloaded
+    def foo(a: int): return 'int'
+
+    @overloaded
+    def foo(a: str): return 'str'
+
+    @overloaded
+    def bar(a: int, b: int) -> int: return a + b
+
+    items = [1, 'a', 2, 'b', 3]
+    assert list(overloaded.foo.map(items)) == ['int', 'str', 'int', 'str', 'int']
+    assert list(overloaded.foo.map(items, chunksize=2)) == ['int', 'str', 'int', 'str', 'int']
+    assert list(overloaded.bar.map([1, 2], [3, 4])) == [4, 6]
+    assert list(overloaded.bar.starmap(iter([(1, 3), (2, 4)]), chunksize=10)) == [4, 6]
+
+    # lazy
+    results = overloaded.foo.map(['a', 1.0])
+    assert next(results) == 'str'
+    with pytest.raises(TypeError):
+        next(results)
+
+    with pytest.raises(ValueError):
+        overloaded.foo.map(items, chunksize=0)
+
+def test_map_stops_at_the_first_unmatched_item(overloaded):
+    called = []
+
+    @overloaded
+    def foo(a: int): called.append(a); return a
+
+    results = overloaded.foo.map([1, 'a', 2, 3], chunksize=4)
+    assert next(results) == 1
+    with pytest.raises(TypeError):
+        next(results)
+    assert called == [1]
+
+def test_map_dispatches_once_per_key():
+    overloaded = Overloader(cache_size=0)
+    checked = []
+
+    class Checked(type):
+        def __instancecheck__(cls, instance):
+            checked.append(instance)
+            return type.__instancecheck__(cls, instance)
+
+    class A(metaclass=Checked): ...
+    class B(A): ...
+
+    @overloaded
+    def foo(a: A): return 'A'
+
+    @overloaded
+    def foo(a: int): return 'int'
+
+    items = [B(), 1, B(), 2, B()]
+    assert list(overloaded.foo.map(items, chunksize=2)) == ['A', 'int', 'A', 'int', 'A']
+    assert len(checked) == 2
+
+def test_buckets_outlive_an_empty_cache():
+    overloaded = Overloader(cache_size=0)
+
+    @overloaded
+    def foo(a: int): return 'int'
+
+    @overloaded
+    def foo(a: str): return 'str'
+
+    assert overloaded.foo(1) == 'int' and overloaded.foo(a='a') == 'str'
+    buckets = dict(overloaded.foo._buckets)
+    assert overloaded.foo(1) == 'int' and overloaded.foo(a='a') == 'str'
+    assert overloaded.foo._buckets == buckets and len(buckets) == 2
+
+def test_freeze(overloaded):
+    @overloaded
+    def foo(a: int): return 'int'
+
+    @overloaded('str')
+    def foo(a: str) -> str: return 'str'
+
+    @overloaded
+    def freeze(a): return 'shadowed'
+
+    @overloaded
+    def prepare(a): return 'shadowed'
+
+    unfrozen = overloaded.foo
+    assert overloaded.freeze('a') == 'shadowed'
+    Overloader.freeze(overloaded)
+
+    foo = overloaded.foo
+    assert type(foo).__name__ == 'FrozenAggregate'
+    assert foo(1) == 'int' and foo('a') == 'str' and foo(a=1) == 'int'
+    assert foo.with_id('str')('a') == 'str'
+    assert list(foo.map([1, 'a'])) == ['int', 'str']
+    assert len(foo) == 2
+    with pytest.raises(TypeError):
+        foo(1.0)
+
+    assert overloaded.prepare('a') == 'shadowed'
+
+    with pytest.raises(AttributeError):
+        foo._store = ()
+    with pytest.raises(AttributeError):
+        overloaded.store.bar = unfrozen
+    with pytest.raises(AttributeError):
+        overloaded.bar
+
+    with pytest.raises(RuntimeError):
+        @overloaded
+        def foo(a: float): ...
+
+    with pytest.raises(RuntimeError):
+        @overloaded.method
+        def foo(a: float): ...
+
+def test_overloads_take_precedence_over_overloader_methods():
+    overloaded = Overloader(lazy=True, descriptors=True)
+
+    @overloaded
+    def stats(a: int): return a * 2
+
+    @overloaded
+    def lazy(a): return a
+
+    @overloaded
+    class prepare:
+        @overloaded.method
+        def meth(self, a: int): return a
+
+    assert overloaded.stats(2) == 4
+    assert overloaded.lazy(1) == 1
+    assert overloaded.prepare.meth(prepare(), 1) == 1
+    assert prepare().meth(1) == 1
+    assert Overloader.stats(overloaded) == {'store': {'stats': {}, 'lazy': {}}, 'clsstore': {'prepare': {'meth': {}}}}
+    Overloader.prepare(overloaded)
+    overloaded.reset_stats()
+
+def test_export(overloaded):
+    @overloaded
+    def foo(a: int): return 'int'
+
+    @overloaded
+    class A:
+        @overloaded.method
+        def meth(self, a: int): return 'meth'
+
+    foo = overloaded.export('foo')
+    assert foo is overloaded.foo and foo(1) == 'int'
+    assert overloaded.export('A.meth') is overloaded.A.meth
+
+    for name in ('bar', 'A.bar', 'B.meth', '_get_inst'):
+        with pytest.raises(AttributeError):
+            overloaded.export(name)
+
+    overloaded.freeze()
+    assert overloaded.export('foo') is overloaded.foo
+
+def test_unknown_names_are_not_created(overloaded):
+    @overloaded
+    def foo(a: int): ...
+
+    with pytest.raises(AttributeError):
+        overloaded.bar
+    assert not hasattr(overloaded, 'bar')
+    assert [name for _, name, _ in overloaded.aggregates()] == ['foo']
+
+    @overloaded
+    class A:
+        @overloaded.method
+        def meth(self): ...
+
+    with pytest.raises(AttributeError):
+        overloaded.A.typo
+    assert [name for _, name, _ in overloaded.aggregates()] == ['foo', 'meth']
+
+    # attributes follow the stores
+    @overloaded
+    def A(a: int): return 'function'
+
+    assert overloaded.A(1) == 'function'
+    del overloaded.store.A
+    assert overloaded.A is overloaded.clsstore.A
+    del overloaded.store.foo
+    with pytest.raises(AttributeError):
+        overloaded.foo
+    with pytest.raises(AttributeError):
+        overloaded.export('foo')
+
+def test_names(overloaded):
+    from overloaded import Aggregate
+
+    @overloaded
+    def foo(a: int): ...
+
+    @overloaded('adder')
+    def foo(a: int, b: int): ...
+
+    assert overloaded.foo.__name__ == 'foo'
+    assert overloaded.foo.__qualname__.endswith('test_names.<locals>.foo')
+    assert overloaded.foo.with_id('adder').__qualname__.endswith("foo['adder']")
+    # named frames are opt-in
+    assert type(overloaded.foo) is Aggregate
+
+def test_named_frames():
+    import cProfile
+    import pstats
+
+    overloaded = Overloader(named_frames=True)
+
+    @overloaded
+    def foo(a: int): return a
+
+    @overloaded
+    class A:
+        @overloaded.method('cls')
+        @classmethod
+        def cmeth(cls, a: int): return cls
+
+    assert overloaded.foo(1) == 1 and overloaded.A.cmeth(A(), 1) is A
+
+    profile = cProfile.Profile()
+    profile.runcall(lambda: (overloaded.foo(1), overloaded.A.cmeth(A, 1)))
+    names = {name for _, _, name in pstats.Stats(profile).stats}
+    assert any(name.startswith('overloaded.') and name.endswith('test_named_frames.<locals>.foo') for name in names)
+    assert any(name.startswith('overloaded.') and name.endswith("A.cmeth['cls']") for name in names)
+
+    overloaded.freeze()
+    assert type(overloaded.foo).__name__.startswith('overloaded.') and overloaded.foo(1) == 1
+
+def test_explain(overloaded):
+    from typing import List
+
+    @overloaded
+    def foo(a: int, b: str): return 'int'
+
+    @overloaded
+    def foo(a: List[int]): return 'list'
+
+    @overloaded
+    def foo(a): return 'any'
+
+    @overloaded
+    def foo(a: str): return 'str'
+
+    explained = overloaded.foo.explain(['a'])
+    assert explained['chosen'] == overloaded.foo._store[-1].label
+    assert explained['cached'] is False
+    outcomes = [(overload['outcome'], overload['reason']) for overload in explained['overloads']]
+    assert outcomes[0] == ('rejected', 'does not take 1 positional arguments')
+    assert outcomes[1][0] == 'rejected' and 'must be int' in outcomes[1][1]
+    assert outcomes[2:] == [('rejected', 'argument "a" is not an instance of str'), ('chosen', None)]
+    assert all(overload['seconds'] >= 0 for overload in explained['overloads'])
+
+    explained = overloaded.foo.explain(b=1, a=1)
+    assert explained['chosen'] is None
+    assert 'argument "b"' in explained['overloads'][0]['reason']
+    assert explained['overloads'][-1]['reason'] == 'does not take 0 positional arguments and keywords a, b'
+
+    assert [overload['outcome'] for overload in overloaded.foo.explain('a')['overloads']][2:] == ['chosen', 'not tried']
+
+    assert overloaded.foo(1, 'b') == 'int'
+    assert overloaded.foo.explain(1, 'b')['cached'] is True
+
+def test_keyword_binding(overloaded):
+    @overloaded
+    def foo(a: int, /, b: str = '', *args: int, c: int = 0, **kwargs: str): return 'int'
+
+    @overloaded
+    def foo(a: str, /, **kwargs: int): return 'str'
+
+    assert overloaded.foo(1, 'b', 2, 3, c=4, a='a', d='d') == 'int'
+    assert overloaded.foo(1, b='b', c=4) == 'int'
+    assert overloaded.foo('a', a=1, b=2) == 'str'
+    for args, kwargs in (((1, 'b', 'c'), {}), ((1,), {'b': 1}), ((1,), {'c': 'c'}), ((1,), {'a': 1}), (('a',), {'a': 'a'})):
+        with pytest.raises(TypeError):
+            overloaded.foo(*args, **kwargs)
+
+    # keywords in another order are cached separately
+    cached = len(overloaded.foo._cache)
+    assert overloaded.foo(1, c=4, b='b') == 'int'
+    assert len(overloaded.foo._cache) == cached + 1
+
+def test_literal_dispatch(overloaded):
+    from typing import Literal, Optional
+    from enum import Enum
+
+    class Color(Enum):
+        RED = 1
+        GREEN = 2
+
+    commands = [f'command{i}' for i in range(100)]
+    for i, command in enumerate(commands):
+        def run(name: Literal[command], arg: int, _i=i): return _i
+        overloaded(run)
+
+    @overloaded
+    def run(name: Optional[Literal['start', 'stop']], arg: int): return name
+
+    @overloaded
+    def run(name: Literal[Color.RED], arg: int): return 'red'
+
+    @overloaded
+    def run(name, arg): return 'fallback'
+
+    assert overloaded.run('command42', 1) == 42
+    assert overloaded.run('stop', 1) == 'stop'
+    assert overloaded.run(None, 1) is None
+    assert overloaded.run(Color.RED, 1) == 'red'
+    assert overloaded.run(Color.GREEN, 1) == 'fallback'
+    assert overloaded.run('command42', 'a') == 'fallback'
+    assert overloaded.run(['unhashable'], 1) == 'fallback'
+    assert overloaded.run(name='command7', arg=1) == 7
+    assert overloaded.run('command7', arg=1) == 7
+
+    # a value only reaches the overloads that accept it, the fallback included
+    assert len(overloaded.run._bucket(2, frozenset()).candidates(('command42', 1))) == 2
+
+    report = overloaded.run.explain('command42', 'a')
+    assert report['chosen'] == report['overloads'][-1]['overload']
+    assert "argument \"name\" is not one of 'command0'" in [entry['reason'] for entry in report['overloads']]
+
+def test_literal_dispatch_after_the_fallback(overloaded):
+    from typing import Literal
+    from enum import Enum
+
+    class Color(Enum):
+        RED = 1
+        GREEN = 2
+
+    @overloaded
+    def foo(a: Literal['put', 'get']): return a
+
+    @overloaded
+    def foo(a: str): return 'fallback'
+
+    @overloaded
+    def bar(a: Literal[Color.RED]): return 'red'
+
+    @overloaded
+    def bar(a): return 'fallback'
+
+    # the fallback is chosen first, for a value of the same type as the literals
+    assert [overloaded.foo(a) for a in ('zzz', 'put', 'zzz', 'get')] == ['fallback', 'put', 'fallback', 'get']
+    assert [overloaded.bar(a) for a in (Color.GREEN, Color.RED)] == ['fallback', 'red']
@@ -241,3 +241,235 @@ def test_collision(overloaded):
 
     overloaded.A.foo(a) # fine
     overloaded.A.foo(_self=a) # bad
+
+def test_only_the_chosen_method_runs(overloaded):
+    calls = []
+
+    @overloaded
+    class A:
+        @overloaded.method
+        @classmethod
+        def foo(cls, a: int):
+            calls.append(('classmethod', cls))
+
+        @overloaded.method
+        @classmethod
+        def foo(cls, a):
+            calls.append(('generic classmethod', cls))
+
+        @overloaded.method
+        @staticmethod
+        def bar(a: str):
+            calls.append('staticmethod')
+
+        @overloaded.method
+        @staticmethod
+        def bar(a):
+            calls.append('generic staticmethod')
+
+    overloaded.A.foo(A(), 1)
+    overloaded.A.foo(cls=A, a='1')
+    overloaded.A.bar('1')
+    overloaded.A.bar(a=1)
+
+    assert calls == [('classmethod', A), ('generic classmethod', A), 'staticmethod', 'generic staticmethod']
+
+def test_method_priority(overloaded):
+    @overloaded
+    class A:
+        @overloaded.method
+        def foo(self, a: object): return 'object'
+
+        @overloaded.method(priority=1)
+        def foo(self, a): return 'any'
+
+        @overloaded.method('int', priority=2)
+        @staticmethod
+        def bar(a: int): return 'int'
+
+        @overloaded.method
+        @staticmethod
+        def bar(a: int): return 'second int'
+
+    assert overloaded.A.foo(A(), 1) == 'any'
+    assert overloaded.A.bar(1) == 'int'
+
+def test_descriptors():
+    overloaded = Overloader(descriptors=True)
+
+    @overloaded
+    class A:
+        hidden = 42
+
+        @overloaded.method
+        def foo(self): return 'foo_' + str(self.hidden)
+
+        @overloaded.method
+        def foo(self, a: int): return a + self.hidden
+
+        @overloaded.method
+        @classmethod
+        def bar(cls): return cls.__name__
+
+        @overloaded.method
+        @classmethod
+        def bar(cls, v: str): return cls.__name__ + v
+
+        @overloaded.method
+        @staticmethod
+        def baz(): return 'baz'
+
+        @overloaded.method
+        @staticmethod
+        def baz(a: int): return -a
+
+    class B(A): ...
+
+    a = A()
+    a.hidden = 13
+
+    assert a.foo() == 'foo_13'
+    assert a.foo(1) == 14
+    assert A.foo(a) == 'foo_13'
+    assert A.bar() == a.bar() == 'A'
+    assert A.bar('!') == 'A!'
+    assert B.bar() == B().bar() == 'B'
+    assert A.bar is A.bar
+    assert A.baz() == a.baz() == 'baz'
+    assert A.baz(1) == -1
+
+    assert overloaded.A.foo(a, 1) == 14
+    assert overloaded.A.bar(a) == 'A'
+
+def test_descriptors_reject_mixed_kinds():
+    overloaded = Overloader(descriptors=True)
+
+    with pytest.raises(TypeError):
+        @overloaded
+        class A:
+            @overloaded.method
+            def foo(self): ...
+
+            @overloaded.method
+            @staticmethod
+            def foo(): ...
+
+def test_invokers_are_precomputed(overloaded):
+    @overloaded
+    class A:
+        @overloaded.method
+        def foo(self): return 'foo'
+
+        @overloaded.method
+        @classmethod
+        def bar(cls, a): return cls, a
+
+        @overloaded.method
+        @staticmethod
+        def baz(a): return a
+
+    foo, = overloaded.A.foo._store
+    bar, = overloaded.A.bar._store
+    baz, = overloaded.A.baz._store
+
+    assert foo.invoke is foo.original
+    assert baz.invoke is baz.original
+
+    kwargs = {'cls': A(), 'a': 1}
+    assert overloaded.A.bar(**kwargs) == (A, 1)
+    assert overloaded.A.bar(A, a=1) == (A, 1)
+    assert len(kwargs) == 2
+
+def test_classmethod_class_by_keyword(overloaded):
+    @overloaded
+    class A:
+        @overloaded.method
+        @classmethod
+        def bar(cls, a: int, b: str = ''): return 'int', cls, a
+
+        @overloaded.method
+        @classmethod
+        def bar(cls, a: str, b: str = ''): return 'str', cls, a
+
+    assert overloaded.A.bar('x', cls=A) == ('str', A, 'x')
+    assert overloaded.A.bar(1, 'b', cls=A()) == ('int', A, 1)
+    assert overloaded.A.bar(1, cls=A, b='b') == ('int', A, 1)
+    explained = overloaded.A.bar.explain('x', cls=A)
+    assert [overload['outcome'] for overload in explained['overloads']] == ['rejected', 'chosen']
+    assert explained['overloads'][0]['reason'] == 'argument "a" is not an instance of int'
+    with pytest.raises(TypeError):
+        overloaded.A.bar(1.0, cls=A)
+
+def test_wrappers_registered_the_older_way(overloaded):
+    from overloaded import WrappedIn
+
+    class traced:
+        def __init__(self, f): self.__func__ = f
+
+    calls = []
+
+    def get_callable(package, args, kwargs):
+        f = package.f
+        return lambda: calls.append(package.original.__name__) or f(*args, **kwargs)
+
+    WrappedIn.register(traced, get_callable, lambda wrapped: wrapped.__func__)
+    try:
+        @overloaded
+        class A:
+            @overloaded.method('int')
+            @traced
+            def foo(a: int): return 'int'
+
+            @overloaded.method
+            @traced
+            def foo(a: str): return 'str'
+
+        assert overloaded.A.foo(1) == 'int' and overloaded.A.foo('a') == 'str'
+        assert overloaded.A.foo.with_id('int', type_check=True)(1) == 'int'
+        with pytest.raises(TypeError):
+            overloaded.A.foo.with_id('int', type_check=True)('a')
+        assert calls == ['foo'] * 4
+    finally:
+        del WrappedIn._registered[traced]
+
+    with pytest.raises(TypeError):
+        WrappedIn.register(traced, get_callable, lambda wrapped: wrapped.__func__, get_invoker=lambda package, f: f)
+
+def test_method_container_check(overloaded):
+    from typing import List
+
+    @overloaded
+    class A:
+        @overloaded.method(container_check='sample:1')
+        @staticmethod
+        def foo(a: List[int]): return 'ints'
+
+        @overloaded.method
+        @staticmethod
+        def foo(a: list): return 'list'
+
+    assert overloaded.A.foo([1, 'unchecked']) == 'ints'
+    assert overloaded.A.foo(['1', 2]) == 'list'
+
+def test_freeze_methods():
+    overloaded = Overloader(descriptors=True)
+
+    @overloaded
+    class A:
+        @overloaded.method
+        def meth(self, a: int): return 'int'
+
+        @overloaded.method
+        def meth(self, a: str): return 'str'
+
+        @overloaded.method
+        @classmethod
+        def cmeth(cls, a: int): return cls
+
+    overloaded.freeze()
+
+    assert type(overloaded.A.meth).__name__ == 'FrozenAggregate'
+    assert A.meth is overloaded.A.meth
+    assert A().meth(1) == 'int' and A().meth('a') == 'str'
+    assert overloaded.A.meth(A(), 'a') == 'str'
+    assert A.cmeth(1) is A
@@ -0,0 +1,55 @@
+from . import *
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+
+overloaded = Overloader()
+
+@overloaded
+def foo(a: int): return a + 1
+
+@overloaded('str')
+def foo(a: str): return a + '!'
+
+@overloaded
+class A:
+    @overloaded.method
+    def meth(self, a: int): return 'int'
+
+    @overloaded.method
+    @classmethod
+    def cmeth(cls, a: str): return cls.__name__
+
+
+def roundtrip(obj):
+    return pickle.loads(pickle.dumps(obj))
+
+
+def test_pickle_by_reference():
+    assert roundtrip(overloaded.foo) is overloaded.foo
+    assert roundtrip(overloaded.A.meth) is overloaded.A.meth
+    assert roundtrip(overloaded.A.cmeth)(A, 'a') == 'A'
+
+    proxy = overloaded.foo.with_id('str')
+    assert roundtrip(proxy) is proxy
+    assert roundtrip(overloaded.foo.with_id('str', type_check=True))('a') == 'a!'
+
+def test_latest_definition_owns_the_reference():
+    def define():
+        overloaded = Overloader()
+
+        @overloaded
+        def bar(a: int): ...
+
+        return overloaded.bar
+
+    first, second = define(), define()
+    assert roundtrip(second) is second
+    with pytest.raises(pickle.PicklingError):
+        pickle.dumps(first)
+
+def test_process_map():
+    assert list(overloaded.foo.process_map([1, 'a', 2], chunksize=2)) == [2, 'a!', 3]
+
+    with ProcessPoolExecutor(2) as executor:
+        assert list(overloaded.A.meth.process_map([A(), A()], [1, 2], executor=executor)) == ['int', 'int']
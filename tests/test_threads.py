@@ -0,0 +1,95 @@
+from . import *
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+
+
+def test_dispatch_while_registering(overloaded):
+    classes = [type(f'C{i}', (), {}) for i in range(50)]
+
+    @overloaded
+    def foo(a): return 'generic'
+
+    def register(i):
+        def foo(a: classes[i]): return i
+        overloaded(foo)
+
+    def call(i):
+        cls = classes[i % len(classes)]
+        for _ in range(200):
+            assert overloaded.foo(cls()) in ('generic', i % len(classes))
+            assert overloaded.foo(i) == 'generic'
+
+    with ThreadPoolExecutor(8) as pool:
+        futures = [pool.submit(call, i) for i in range(100)]
+        futures += [pool.submit(register, i) for i in range(len(classes))]
+        for future in futures:
+            future.result()
+
+    assert len(overloaded.foo) == len(classes) + 1
+    for i, cls in enumerate(classes):
+        assert overloaded.foo(cls()) == i
+
+def test_concurrent_class_decoration(overloaded):
+    barrier = Barrier(4)
+
+    def decorate(i):
+        class_body_started = barrier.wait
+
+        @overloaded
+        class A:
+            class_body_started()
+
+            @overloaded.method
+            def foo(self, a: int, _i=i): return _i
+
+        return A
+
+    with ThreadPoolExecutor(4) as pool:
+        classes = list(pool.map(decorate, range(4)))
+
+    assert len(overloaded.A.foo) == 4
+    assert {package.cls for package in overloaded.A.foo._store} == set(classes)
+
+def test_concurrent_lazy_preparation():
+    overloaded = Overloader(lazy=True)
+
+    for i in range(20):
+        def foo(a: int, _i=i): return _i
+        overloaded(foo)
+
+    with ThreadPoolExecutor(8) as pool:
+        assert set(pool.map(lambda _: overloaded.foo(1), range(64))) == {0}
+
+    assert len(overloaded.foo) == 20
+
+def test_no_stale_outcome_between_registration_steps(overloaded):
+    from overloaded import Aggregate
+
+    class C: ...
+
+    @overloaded
+    def foo(a): return 'generic'
+
+    foo = overloaded.foo
+    batch = foo.map(iter(C, None))
+    assert foo(C()) == next(batch) == 'generic'
+
+    def trace(frame, event, arg):
+        return step if frame.f_code is Aggregate.add.__code__ else None
+
+    def step(frame, event, arg):
+        # calls of another thread, landing between any two steps of the registration
+        if event == 'line':
+            foo(C())
+            next(batch)
+        return step
+
+    previous = sys.gettrace()
+    sys.settrace(trace)
+    try:
+        @overloaded
+        def foo(a: C): return 'C'
+    finally:
+        sys.settrace(previous)
+
+    assert foo(C()) == next(batch) == 'C'